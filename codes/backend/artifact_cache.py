@@ -0,0 +1,167 @@
+# artifact_cache.py
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+# Import centralized configuration
+from config import ARTIFACT_CACHE_ENABLED, ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_MAX_SIZE_MB
+
+EVICT_TO_FRACTION = 0.9  # eviction shrinks the cache to this share of max_size_mb
+
+
+# -------------------------------
+# Content Hashing
+# -------------------------------
+def file_content_hash(path, chunk_size=1024 * 1024):
+    """
+    Return the SHA-256 hex digest of a file's bytes, read in 1 MB chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_content_hash(texts):
+    """
+    Return the SHA-256 hex digest of a list of strings.
+    """
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+# -------------------------------
+# Artifact Cache
+# -------------------------------
+class ArtifactCache:
+    """
+    Stores pipeline stage outputs on local disk, keyed by the input video's
+    content hash plus the stage name and parameters.
+    JSON artifacts are stored as .json and arrays as .npy; the least recently
+    used files are evicted once the cache grows past max_size_mb.
+    """
+
+    def __init__(self, cache_dir=ARTIFACT_CACHE_DIR, max_size_mb=ARTIFACT_CACHE_MAX_SIZE_MB, enabled=ARTIFACT_CACHE_ENABLED):
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._size_bytes = None  # running total of the cached files, counted on the first write
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, content_hash, stage, **params):
+        payload = json.dumps({"content": content_hash, "stage": stage, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, content_hash, stage, suffix, params):
+        return self.cache_dir / stage / f"{self.key(content_hash, stage, **params)}{suffix}"
+
+    def _lookup(self, path):
+        if not self.enabled or not path.exists():
+            return None
+        # Refresh the mtime so eviction treats this entry as recently used
+        os.utime(path)
+        return path
+
+    def _store(self, path, write):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            replaced = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        # Only walk the cache directory when the running total says it is over the limit
+        with self._lock:
+            if self._size_bytes is None:
+                self._size_bytes = self._scan()[1]
+            else:
+                self._size_bytes += path.stat().st_size - replaced
+            over = self._size_bytes > self.max_size_bytes
+        if over:
+            self._evict()
+
+    def get_json(self, content_hash, stage, **params):
+        path = self._lookup(self._path(content_hash, stage, ".json", params))
+        if path is None:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def put_json(self, content_hash, stage, value, **params):
+        if not self.enabled or content_hash is None:
+            return
+        path = self._path(content_hash, stage, ".json", params)
+        self._store(path, lambda f: f.write(json.dumps(value, separators=(",", ":")).encode("utf-8")))
+
+    def get_array(self, content_hash, stage, **params):
+        path = self._lookup(self._path(content_hash, stage, ".npy", params))
+        if path is None:
+            return None
+        return np.load(path)
+
+    def put_array(self, content_hash, stage, value, **params):
+        if not self.enabled or content_hash is None:
+            return
+        path = self._path(content_hash, stage, ".npy", params)
+        self._store(path, lambda f: np.save(f, value))
+
+    def get_or_compute_json(self, content_hash, stage, compute, **params):
+        """
+        Return the cached artifact for this stage, or compute, store and return it.
+        """
+        if content_hash is not None:
+            cached = self.get_json(content_hash, stage, **params)
+            if cached is not None:
+                print(f"[INFO] Using cached {stage}")
+                return cached
+        value = compute()
+        self.put_json(content_hash, stage, value, **params)
+        return value
+
+    def _scan(self):
+        """(mtime, size, path) of every cached file, and their total size."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.rglob("*"):
+            if path.is_file() and path.suffix in (".json", ".npy"):
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return entries, total
+
+    def _evict(self):
+        with self._lock:
+            # Rescan rather than trust the running total (other processes may share the directory),
+            # and free some headroom so the next writes do not trigger another scan right away
+            entries, total = self._scan()
+            target = self.max_size_bytes * EVICT_TO_FRACTION
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                except FileNotFoundError:
+                    pass
+            self._size_bytes = total
+
+
+# Process-wide cache shared by all pipeline stages
+artifact_cache = ArtifactCache()
@@ -0,0 +1,96 @@
+# bench_captioning.py
+# BLIP captioning throughput per backend: the per-frame loop (batch size 1) vs batched generate() calls.
+# Reports frames/sec per backend and batch size, plus how closely each run's captions match
+# the first run (the first backend's first batch size, fp32 per-frame by default).
+# Needs the real BLIP model (config.BLIP_MODEL).
+#
+#   python benchmarks/bench_captioning.py --video review.mp4 --frames 64
+#   python benchmarks/bench_captioning.py --backends torch torch_int8 --batch-sizes 1 8
+import argparse
+import difflib
+import os
+import tempfile
+
+from bench_utils import make_synthetic_video, measure, write_results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per-frame vs batched BLIP captioning benchmark")
+    parser.add_argument("--video", help="Video to take frames from (default: synthetic video)")
+    parser.add_argument("--frames", type=int, default=32, help="Number of evenly spaced frames to caption")
+    parser.add_argument("--backends", nargs="+", default=["torch"],
+                        help="Captioning backends to compare (the first one is the caption reference)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 0],
+                        help="Batch sizes to compare (1 = per-frame loop, 0 = sized from free memory)")
+    parser.add_argument("--output", default="benchmarks/results/captioning.json")
+    return parser.parse_args()
+
+
+def caption_similarity(reference, captions):
+    """Mean word-level similarity of paired captions (1.0 = identical)."""
+    ratios = [difflib.SequenceMatcher(None, a.split(), b.split()).ratio() for a, b in zip(reference, captions)]
+    return round(sum(ratios) / len(ratios), 3) if ratios else 1.0
+
+
+def main():
+    args = parse_args()
+
+    import cv2
+    from model_registry import model_registry
+    from get_description_from_blip import extract_frames, generate_visual_descriptions, caption_batch_size, blip_model_name
+
+    with tempfile.TemporaryDirectory() as workdir:
+        video_path = args.video or make_synthetic_video(os.path.join(workdir, "video.mp4"), max(10, args.frames))
+
+        cap = cv2.VideoCapture(video_path)
+        duration = cap.get(cv2.CAP_PROP_FRAME_COUNT) / (cap.get(cv2.CAP_PROP_FPS) or 25)
+        cap.release()
+        timestamps = [duration * (i + 0.5) / args.frames for i in range(args.frames)]
+        frames = extract_frames(video_path, timestamps)
+
+        runs = []
+        reference = None
+        for backend in args.backends:
+            # Load the model outside the timed runs
+            model_name = blip_model_name(backend)
+            processor, model, device = model_registry.get(model_name)
+            generate_visual_descriptions(processor, model, device, frames[:1], batch_size=1, backend=backend)
+
+            for batch_size in args.batch_sizes:
+                size = caption_batch_size(device, batch_size)
+                print(f"[INFO] Captioning {len(frames)} frames with {backend}, batch size {size}")
+                descriptions, stats = measure(
+                    generate_visual_descriptions, processor, model, device, frames, size, backend=backend
+                )
+                captions = [desc["text"] for desc in descriptions]
+                if reference is None:
+                    reference = captions
+                same = sum(a == b for a, b in zip(reference, captions))
+                runs.append({
+                    "name": f"{backend} " + ("per-frame" if size == 1 else f"batch {size}" + (" (auto)" if batch_size <= 0 else "")),
+                    "backend": backend,
+                    "batch_size": size,
+                    "frames": len(descriptions),
+                    "frames_per_second": round(len(descriptions) / stats["wall_seconds"], 2) if stats["wall_seconds"] else None,
+                    "identical_captions": round(same / len(reference), 3) if reference else 1.0,
+                    "caption_similarity": caption_similarity(reference, captions),
+                    **stats
+                })
+            model_registry.evict(model_name)
+
+    for run in runs:
+        print(f"[INFO] {run['name']}: {run['frames_per_second']} frames/s, {run['wall_seconds']}s, "
+              f"peak RSS {run['peak_rss_mb']} MB, {run['identical_captions']:.0%} captions identical to the first run, "
+              f"similarity {run['caption_similarity']}")
+
+    config = {
+        "video": args.video or "synthetic",
+        "frames": len(frames),
+        "backends": args.backends,
+        "reference": runs[0]["name"] if runs else None,
+    }
+    write_results(args.output, "captioning", config, runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# bench_frame_extraction.py
+# Frame extraction benchmark: one seek per timestamp vs one forward decode pass (grab/retrieve),
+# on a sparse and a dense list of target timestamps. Also reports which mode "auto" picks
+# and whether both modes return the same frames.
+#
+#   python benchmarks/bench_frame_extraction.py --duration 300
+#   python benchmarks/bench_frame_extraction.py --video review.mp4 --sparse 10 --dense 300
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from bench_utils import make_synthetic_video, measure, write_results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seek vs scan frame extraction benchmark")
+    parser.add_argument("--video", help="Video to extract frames from (default: synthetic video)")
+    parser.add_argument("--duration", type=float, default=180, help="Length of the synthetic video in seconds")
+    parser.add_argument("--sparse", type=int, default=8, help="Number of targets in the sparse list")
+    parser.add_argument("--dense", type=int, default=120, help="Number of targets in the dense list")
+    parser.add_argument("--output", default="benchmarks/results/frame_extraction.json")
+    return parser.parse_args()
+
+
+def target_list(duration, count, seed):
+    """count random timestamps over the video, like scene starts (unsorted, as callers may pass them)."""
+    rng = np.random.default_rng(seed)
+    return [round(float(ts), 2) for ts in rng.uniform(0, duration * 0.98, count)]
+
+
+def main():
+    args = parse_args()
+
+    import cv2
+    from get_description_from_blip import extract_frames, choose_extraction_mode
+
+    with tempfile.TemporaryDirectory() as workdir:
+        video_path = args.video or make_synthetic_video(os.path.join(workdir, "video.mp4"), args.duration)
+
+        cap = cv2.VideoCapture(video_path)
+        duration = cap.get(cv2.CAP_PROP_FRAME_COUNT) / (cap.get(cv2.CAP_PROP_FPS) or 25)
+        cap.release()
+
+        runs = []
+        for name, count in (("sparse", args.sparse), ("dense", args.dense)):
+            timestamps = target_list(duration, count, seed=count)
+            auto = choose_extraction_mode(timestamps, "auto")
+            results = {}
+            for mode in ("seek", "scan"):
+                print(f"[INFO] Extracting {count} {name} targets by {mode}")
+                frames, stats = measure(extract_frames, video_path, timestamps, None, mode)
+                results[mode] = frames
+                runs.append({
+                    "name": f"{name} {mode}",
+                    "targets": count,
+                    "mode": mode,
+                    "auto_choice": auto == mode,
+                    "frames": len(frames),
+                    **stats
+                })
+            seek, scan = results["seek"], results["scan"]
+            identical = len(seek) == len(scan) and all(
+                np.array_equal(a["image"], b["image"]) for a, b in zip(seek, scan)
+            )
+            runs[-1]["identical_to_seek"] = identical
+
+    for run in runs:
+        print(f"[INFO] {run['name']}: {run['wall_seconds']}s for {run['frames']} frames"
+              + (" (auto picks this)" if run["auto_choice"] else "")
+              + (f", identical to seek: {run['identical_to_seek']}" if "identical_to_seek" in run else ""))
+
+    config = {
+        "video": args.video or f"synthetic {args.duration}s",
+        "duration": round(duration, 2),
+        "sparse": args.sparse,
+        "dense": args.dense,
+    }
+    write_results(args.output, "frame_extraction", config, runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# bench_pipeline.py
+# Offline end-to-end benchmark of process_video_to_teaser on synthetic videos.
+#
+#   python benchmarks/bench_pipeline.py --durations 30 120 --methods learning_b gemini
+#   python benchmarks/bench_pipeline.py --baseline results/pipeline_main.json --tolerance 0.2
+#
+# By default every model/service is stubbed (see stub_backends.py); pass
+# --stub with a subset (or --stub none) to benchmark real backends instead.
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_utils import RssSampler, StageRecorder, make_synthetic_video, process_cpu_seconds, write_results
+
+METHODS = ("learning_a", "learning_b", "cinematic_a", "gemini")
+COMPARED_METRICS = ("wall_seconds", "cpu_seconds", "peak_rss_mb")
+
+
+def parse_args():
+    from stub_backends import BACKENDS
+
+    parser = argparse.ArgumentParser(description="Offline end-to-end teaser pipeline benchmark")
+    parser.add_argument("--durations", type=float, nargs="+", default=[30, 120], help="Synthetic video lengths in seconds")
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS))
+    parser.add_argument("--stub", nargs="+", choices=list(BACKENDS) + ["none"], default=list(BACKENDS),
+                        help="Backends to replace with stubs (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per duration/method (the fastest is reported)")
+    parser.add_argument("--workdir", default=None, help="Scratch directory (default: a temporary directory)")
+    parser.add_argument("--output", default="benchmarks/results/pipeline.json")
+    parser.add_argument("--baseline", default=None, help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before a run is flagged")
+    return parser.parse_args()
+
+
+def isolate_environment(workdir):
+    """
+    Point caches, S3, download and output directories into the scratch workdir.
+    Must run before the backend modules (and config) are imported.
+    """
+    workdir = os.path.abspath(workdir)
+    os.environ.setdefault("DOWNLOAD_DIR", os.path.join(workdir, "downloads"))
+    os.environ.setdefault("OUTPUT_DIR", os.path.join(workdir, "output"))
+    # Warm caches would make later runs look faster than the first
+    os.environ.setdefault("ARTIFACT_CACHE_ENABLED", "false")
+    os.environ.setdefault("CAPTION_CACHE_ENABLED", "false")
+    os.environ.setdefault("CAPTION_CACHE_PATH", os.path.join(workdir, "caption_cache.sqlite3"))
+    os.environ.setdefault("S3_BACKEND", "local")
+    os.environ.setdefault("S3_LOCAL_DIR", os.path.join(workdir, "s3"))
+    os.environ.setdefault("BUCKET_NAME", "teaser-benchmark")
+    os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+    os.environ.setdefault("PRELOAD_MODELS", "")
+    # The pipeline still writes some intermediates relative to the working directory
+    os.chdir(workdir)
+
+
+def run_once(video_path, method, run_dir):
+    from main import process_video_to_teaser
+
+    with RssSampler() as sampler, StageRecorder(sampler) as recorder:
+        cpu_start = process_cpu_seconds()
+        start = time.perf_counter()
+        result = process_video_to_teaser(video_path, is_youtube=False, method=method, output_dir=run_dir)
+        wall = time.perf_counter() - start
+        cpu = process_cpu_seconds() - cpu_start
+    return {
+        "wall_seconds": round(wall, 3),
+        "cpu_seconds": round(cpu, 3),
+        "peak_rss_mb": sampler.peak_mb(),
+        "stages": recorder.summary(),
+        "dag": result["timings"],
+        "teaser_seconds": round(result["duration"], 2),
+    }
+
+
+def compare(runs, baseline_path, tolerance):
+    """
+    Print per-run deltas against a baseline results file and return the regressions.
+    """
+    with open(baseline_path) as f:
+        baseline = {run["name"]: run for run in json.load(f)["runs"]}
+
+    regressions = []
+    for run in runs:
+        previous = baseline.get(run["name"])
+        if previous is None:
+            print(f"[INFO] {run['name']}: no baseline")
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = previous[metric], run[metric]
+            change = (new - old) / old if old else 0.0
+            flag = "REGRESSION" if change > tolerance else "ok"
+            print(f"[INFO] {run['name']} {metric}: {old} -> {new} ({change:+.1%}) {flag}")
+            if change > tolerance:
+                regressions.append((run["name"], metric, old, new))
+    return regressions
+
+
+def main():
+    args = parse_args()
+    stubs = [] if "none" in args.stub else args.stub
+    output = Path(args.output).resolve()
+    baseline = Path(args.baseline).resolve() if args.baseline else None
+
+    initial_cwd = os.getcwd()
+    workdir = args.workdir or tempfile.mkdtemp(prefix="teaser-bench-")
+    Path(workdir).mkdir(parents=True, exist_ok=True)
+    isolate_environment(workdir)
+
+    from stub_backends import stub_backends
+
+    runs = []
+    with stub_backends(stubs):
+        for duration in args.durations:
+            video_path = make_synthetic_video(os.path.join(workdir, f"synthetic_{int(duration)}s.mp4"), duration)
+            for method in args.methods:
+                name = f"{method}@{int(duration)}s"
+                attempts = []
+                for attempt in range(args.repeat):
+                    run_dir = os.path.join(workdir, "output", f"{name}-{attempt}")
+                    os.makedirs(run_dir, exist_ok=True)
+                    print(f"[INFO] Benchmarking {name} (run {attempt + 1}/{args.repeat})")
+                    attempts.append(run_once(video_path, method, run_dir))
+                best = min(attempts, key=lambda run: run["wall_seconds"])
+                runs.append({"name": name, "method": method, "video_seconds": duration, **best})
+                print(f"[INFO] {name}: {best['wall_seconds']}s wall, {best['cpu_seconds']}s CPU, {best['peak_rss_mb']} MB peak RSS")
+
+    config = {
+        "durations": args.durations,
+        "methods": args.methods,
+        "stubbed_backends": stubs,
+        "repeat": args.repeat,
+    }
+    write_results(output, "pipeline", config, runs)
+
+    os.chdir(initial_cwd)
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if baseline:
+        regressions = compare(runs, baseline, args.tolerance)
+        if regressions:
+            print(f"[ERROR] {len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# bench_scene_detection.py
+# Scene detection benchmark: PySceneDetect's ContentDetector on every frame ("full") vs the
+# downscaled, strided detector with frame-accurate refinement ("fast").
+# Reports wall time, speedup over full and how many cuts agree with full (within --tolerance frames).
+#
+#   python benchmarks/bench_scene_detection.py --duration 300 --strides 1 5 10
+#   python benchmarks/bench_scene_detection.py --video review.mp4 --heights 96 144 240
+import argparse
+import os
+import tempfile
+
+from bench_utils import make_synthetic_video, measure, write_results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PySceneDetect vs fast scene detection benchmark")
+    parser.add_argument("--video", help="Video to analyse (default: synthetic video with a hard cut every 4 s)")
+    parser.add_argument("--duration", type=float, default=120, help="Length of the synthetic video in seconds")
+    parser.add_argument("--strides", type=int, nargs="+", default=[1, 5, 10], help="Fast mode frame strides")
+    parser.add_argument("--heights", type=int, nargs="+", default=[144], help="Fast mode analysis heights")
+    parser.add_argument("--threshold", type=float, default=12.0)
+    parser.add_argument("--tolerance", type=int, default=1, help="Frames two cuts may differ by and still agree")
+    parser.add_argument("--output", default="benchmarks/results/scene_detection.json")
+    return parser.parse_args()
+
+
+def agreement(reference, cuts, fps, tolerance):
+    """Cuts (scene starts after 0.0) of `cuts` matched one-to-one with reference cuts within tolerance frames."""
+    reference = [round(ts * fps) for ts in reference[1:]]
+    cuts = [round(ts * fps) for ts in cuts[1:]]
+    unmatched = list(reference)
+    matched, offsets = 0, []
+    for cut in cuts:
+        nearest = min(unmatched, key=lambda ref: abs(ref - cut), default=None)
+        if nearest is not None and abs(nearest - cut) <= tolerance:
+            unmatched.remove(nearest)
+            matched += 1
+            offsets.append(abs(nearest - cut))
+    return {
+        "cuts": len(cuts),
+        "reference_cuts": len(reference),
+        "precision": round(matched / len(cuts), 3) if cuts else 1.0,
+        "recall": round(matched / len(reference), 3) if reference else 1.0,
+        "exact_frame": sum(offset == 0 for offset in offsets),
+    }
+
+
+def main():
+    args = parse_args()
+
+    import cv2
+    from get_description_from_blip import detect_scenes_pyscenedetect, detect_scenes_fast
+
+    with tempfile.TemporaryDirectory() as workdir:
+        video_path = args.video or make_synthetic_video(os.path.join(workdir, "video.mp4"), args.duration, scene_seconds=4)
+
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25
+        cap.release()
+
+        print("[INFO] Detecting scenes with PySceneDetect (full)")
+        reference, stats = measure(detect_scenes_pyscenedetect, video_path, args.threshold)
+        full_seconds = stats["wall_seconds"]
+        runs = [{"name": "full", **agreement(reference, reference, fps, args.tolerance), "speedup": 1.0, **stats}]
+
+        for height in args.heights:
+            for stride in args.strides:
+                print(f"[INFO] Detecting scenes fast at {height}p, stride {stride}")
+                scenes, stats = measure(detect_scenes_fast, video_path, args.threshold, stride, height)
+                runs.append({
+                    "name": f"fast {height}p stride {stride}",
+                    "height": height,
+                    "stride": stride,
+                    **agreement(reference, scenes, fps, args.tolerance),
+                    "speedup": round(full_seconds / stats["wall_seconds"], 2) if stats["wall_seconds"] else None,
+                    **stats
+                })
+
+    for run in runs:
+        print(f"[INFO] {run['name']}: {run['wall_seconds']}s (x{run['speedup']}), {run['cuts']} cuts, "
+              f"precision {run['precision']}, recall {run['recall']}, {run['exact_frame']} on the same frame")
+
+    config = {
+        "video": args.video or f"synthetic {args.duration}s",
+        "threshold": args.threshold,
+        "tolerance_frames": args.tolerance,
+    }
+    write_results(args.output, "scene_detection", config, runs)
+
+
+if __name__ == "__main__":
+    main()
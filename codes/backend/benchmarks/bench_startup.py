@@ -0,0 +1,106 @@
+# bench_startup.py
+# Cold-start benchmark: import time, peak RSS and heavy libraries loaded when importing
+# the API and the pipeline, and the cost of main.warm_up(), each in a fresh interpreter.
+#
+#   python benchmarks/bench_startup.py --repeat 5
+#   python benchmarks/bench_startup.py --warm-up-models sentence_transformer
+#
+# Exits with status 1 when importing main_fastapi loads any of the heavy libraries.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from bench_utils import BACKEND_DIR, write_results
+
+# Libraries that dominate cold start when imported eagerly
+HEAVY_MODULES = (
+    "torch", "transformers", "whisper_timestamped", "sentence_transformers", "faiss",
+    "scenedetect", "cv2", "yt_dlp", "google.generativeai", "ollama", "pyttsx3",
+)
+
+# Modules that must import without any of HEAVY_MODULES (an auth/history-only API worker)
+LIGHT_MODULES = ("main_fastapi",)
+
+PROBE = r"""
+import json, resource, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "seconds": seconds,
+    "peak_rss_mb": (peak if sys.platform == "darwin" else peak * 1024) / (1024 * 1024),
+    "heavy_modules": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="API and pipeline cold-start benchmark")
+    parser.add_argument("--modules", nargs="+", default=["main_fastapi", "main"], help="Modules to import cold")
+    parser.add_argument("--warm-up-models", nargs="*", default=[], help="Models for the main.warm_up() measurement")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per measurement (the median is reported)")
+    parser.add_argument("--output", default="benchmarks/results/startup.json")
+    return parser.parse_args()
+
+
+def probe(statement, repeat):
+    """Run statement in `repeat` fresh interpreters and return the median measurement."""
+    env = dict(os.environ)
+    # The API must boot without optional credentials
+    env.pop("GEMINI_API_KEY", None)
+    samples = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"}
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    return {
+        "seconds": round(statistics.median(s["seconds"] for s in samples), 3),
+        "peak_rss_mb": round(statistics.median(s["peak_rss_mb"] for s in samples), 1),
+        "heavy_modules": samples[0]["heavy_modules"],
+    }
+
+
+def main():
+    args = parse_args()
+    runs = []
+
+    for module in args.modules:
+        print(f"[INFO] Importing {module}")
+        runs.append({"name": f"import {module}", **probe(f"import {module}", args.repeat)})
+
+    statement = f"import main; main.warm_up({args.warm_up_models!r})"
+    print(f"[INFO] Running main.warm_up({args.warm_up_models})")
+    runs.append({"name": "import main + warm_up", **probe(statement, args.repeat)})
+
+    for run in runs:
+        if "error" in run:
+            print(f"[ERROR] {run['name']}: {run['error']}")
+        else:
+            heavy = ", ".join(run["heavy_modules"]) or "none"
+            print(f"[INFO] {run['name']}: {run['seconds']}s, {run['peak_rss_mb']} MB peak RSS, heavy modules: {heavy}")
+
+    config = {"modules": args.modules, "warm_up_models": args.warm_up_models, "repeat": args.repeat}
+    write_results(args.output, "startup", config, runs)
+
+    # Fail (e.g. in CI) when a module that must stay light pulls in the ML stack
+    heavy_imports = [
+        run for run in runs
+        if run["name"] in {f"import {module}" for module in LIGHT_MODULES} and run.get("heavy_modules")
+    ]
+    for run in heavy_imports:
+        print(f"[ERROR] {run['name']} loads heavy modules: {', '.join(run['heavy_modules'])}")
+    if heavy_imports:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# bench_text_cleaning.py
+# Text cleaning micro-benchmark: the previous per-segment re.sub calls vs the shared TextNormalizer
+# (one precompiled trie regex pass per segment), on transcript- and caption-like segments.
+# Reports segments/sec and how many outputs differ from the previous cleaning.
+#
+#   python benchmarks/bench_text_cleaning.py --segments 100000
+import argparse
+import random
+import re
+import time
+
+from bench_utils import write_results
+
+TRANSCRIPT_WORDS = (
+    "so um the machines uh actually became self aware and you know they like wiped out mankind "
+    "but I'm not going to leave you hanging here's a bit of the backstory"
+).split()
+CAPTION_OPENINGS = ["there is a", "there are", "a close up of", "a picture of", "arafed", "araffes", "a"]
+CAPTION_WORDS = "man in a black shirt and black jacket standing in front of a red background".split()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per-segment regex cleaning vs the shared text normalizer")
+    parser.add_argument("--segments", type=int, default=100000, help="Segments per kind")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation (the best is reported)")
+    parser.add_argument("--output", default="benchmarks/results/text_cleaning.json")
+    return parser.parse_args()
+
+
+# -------------------------------
+# Previous Cleaning (reference)
+# -------------------------------
+def legacy_clean_transcript(text):
+    text = re.sub(r'\b(um|uh|you know|like|actually)\b', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def legacy_clean_caption(text):
+    patterns = [
+        r'^there is (a|an)?\s?',
+        r'^there are ',
+        r'^a close up of ',
+        r'^a picture of ',
+        r'^arafed\s?',
+        r'^araffes\s?'
+    ]
+    for pattern in patterns:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def make_segments(count, seed=0):
+    rng = random.Random(seed)
+    transcripts = [" ".join(rng.choices(TRANSCRIPT_WORDS, k=rng.randint(6, 24))) for _ in range(count)]
+    captions = [
+        rng.choice(CAPTION_OPENINGS) + " " + " ".join(rng.choices(CAPTION_WORDS, k=rng.randint(5, 12)))
+        for _ in range(count)
+    ]
+    return transcripts, captions
+
+
+def best_time(fn, texts, repeat):
+    best, output = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn(texts)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return output, best
+
+
+def main():
+    args = parse_args()
+
+    from clean_audio_transcripts import transcript_normalizer
+    from clean_visual_descriptions import caption_normalizer
+
+    transcripts, captions = make_segments(args.segments)
+    cases = [
+        ("transcripts", transcripts, legacy_clean_transcript, transcript_normalizer),
+        ("captions", captions, legacy_clean_caption, caption_normalizer),
+    ]
+
+    runs = []
+    for kind, texts, legacy, normalizer in cases:
+        print(f"[INFO] Cleaning {len(texts)} {kind}")
+        reference, legacy_seconds = best_time(lambda batch: [legacy(text) for text in batch], texts, args.repeat)
+        output, seconds = best_time(normalizer.normalize_many, texts, args.repeat)
+        differing = sum(a != b for a, b in zip(reference, output))
+        for name, wall in (("per-segment re.sub", legacy_seconds), ("TextNormalizer", seconds)):
+            runs.append({
+                "name": f"{kind} {name}",
+                "segments": len(texts),
+                "wall_seconds": round(wall, 4),
+                "segments_per_second": round(len(texts) / wall),
+            })
+        runs[-1]["speedup"] = round(legacy_seconds / seconds, 2)
+        runs[-1]["differing_outputs"] = differing
+
+    for run in runs:
+        print(f"[INFO] {run['name']}: {run['wall_seconds']}s ({run['segments_per_second']} segments/s)"
+              + (f", x{run['speedup']}, {run['differing_outputs']} outputs differ" if "speedup" in run else ""))
+
+    write_results(args.output, "text_cleaning", {"segments": args.segments, "repeat": args.repeat}, runs)
+
+
+if __name__ == "__main__":
+    main()
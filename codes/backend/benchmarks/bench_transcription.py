@@ -0,0 +1,114 @@
+# bench_transcription.py
+# Transcription benchmark per backend: one call over the whole file vs VAD-gated parallel windows.
+# Reports wall time, real-time factor (wall / audio seconds), the share of audio VAD kept and
+# how closely each run's words match the first backend's single-call transcript.
+#
+#   python benchmarks/bench_transcription.py --audio talk.mp4 --workers 1 2 4
+#   python benchmarks/bench_transcription.py --backends whisper_timestamped faster_whisper --duration 120
+import argparse
+import difflib
+import os
+import re
+import subprocess
+import tempfile
+
+from bench_utils import make_synthetic_wav, measure, write_results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Single-call vs chunked Whisper transcription benchmark")
+    parser.add_argument("--audio", help="Audio or video file (default: synthetic speech-like audio)")
+    parser.add_argument("--duration", type=float, default=60, help="Length of the synthetic audio in seconds")
+    parser.add_argument("--backends", nargs="+", default=["whisper_timestamped", "faster_whisper"],
+                        help="Transcription backends to compare (the first one is the word-similarity reference)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2], help="Worker counts for chunked mode")
+    parser.add_argument("--output", default="benchmarks/results/transcription.json")
+    return parser.parse_args()
+
+
+def to_whisper_wav(source, workdir):
+    """Convert any audio/video file to the 16 kHz mono PCM16 WAV the pipeline transcribes."""
+    path = os.path.join(workdir, "audio.wav")
+    subprocess.run(
+        ["ffmpeg", "-y", "-v", "error", "-i", source, "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1", path],
+        check=True
+    )
+    return path
+
+
+def words(segments):
+    text = " ".join(text for _, _, text in segments)
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def similarity(reference, segments):
+    return round(difflib.SequenceMatcher(None, words(reference), words(segments)).ratio(), 3)
+
+
+def main():
+    args = parse_args()
+
+    from model_registry import model_registry
+    from transcribe_audio_from_whisper import transcribe_single
+    from transcription_backends import get_transcription_backend
+    from transcription_engine import SAMPLE_RATE, open_wav, detect_speech, transcribe_chunked, shutdown_transcription_pool
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.audio:
+            audio_path = to_whisper_wav(args.audio, workdir)
+        else:
+            audio_path = make_synthetic_wav(os.path.join(workdir, "audio.wav"), args.duration)
+
+        with open_wav(audio_path) as audio:
+            audio_seconds = audio.duration
+            speech_seconds = sum(end - start for start, end in detect_speech(audio)) / SAMPLE_RATE
+        print(f"[INFO] {audio_seconds:.1f}s of audio, {speech_seconds:.1f}s detected as speech")
+
+        runs = []
+        reference = None
+        for backend in args.backends:
+            # Load the model outside the timed runs
+            model_name = get_transcription_backend(backend).model_name
+            model_registry.get(model_name)
+
+            print(f"[INFO] Transcribing with one {backend} call")
+            segments, stats = measure(transcribe_single, audio_path, backend)
+            if reference is None:
+                reference = segments
+            runs.append({"name": f"{backend} single", "backend": backend, "segments": len(segments),
+                         "word_similarity": similarity(reference, segments), **stats})
+
+            for workers in args.workers:
+                # Pool start-up and per-worker model loading are one-off costs, so warm the pool first
+                if workers > 1:
+                    transcribe_chunked(audio_path, workers=workers, backend=backend)
+
+                print(f"[INFO] Transcribing {backend} in chunked mode with {workers} worker(s)")
+                segments, stats = measure(transcribe_chunked, audio_path, workers=workers, backend=backend)
+                runs.append({
+                    "name": f"{backend} chunked x{workers}",
+                    "backend": backend,
+                    "workers": workers,
+                    "segments": len(segments),
+                    "word_similarity": similarity(reference, segments),
+                    **stats
+                })
+            model_registry.evict(model_name)
+        shutdown_transcription_pool()
+
+    for run in runs:
+        run["rtf"] = round(run["wall_seconds"] / audio_seconds, 3)
+        print(f"[INFO] {run['name']}: {run['wall_seconds']}s (RTF {run['rtf']}), {run['segments']} segments, "
+              f"word similarity {run['word_similarity']}")
+
+    config = {
+        "audio": args.audio or f"synthetic {args.duration}s",
+        "backends": args.backends,
+        "audio_seconds": round(audio_seconds, 2),
+        "speech_ratio": round(speech_seconds / audio_seconds, 3) if audio_seconds else 0,
+    }
+    write_results(args.output, "transcription", config, runs)
+
+
+if __name__ == "__main__":
+    main()
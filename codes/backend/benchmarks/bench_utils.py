@@ -0,0 +1,211 @@
+# bench_utils.py
+# Shared helpers for the offline benchmarks: synthetic inputs, RSS sampling,
+# per-stage recording and JSON result files that can be compared across commits.
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Benchmarks import the backend modules directly, like the backend does itself
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+# -------------------------------
+# Synthetic Inputs
+# -------------------------------
+def make_synthetic_video(path, duration, width=640, height=360, fps=25, scene_seconds=8, speech_period=6):
+    """
+    Render a synthetic test video with ffmpeg lavfi sources.
+    Video: testsrc2 flipped and hue-shifted every scene_seconds (hard scene cuts).
+    Audio: a 180 Hz tone amplitude-modulated at a syllable-like 4 Hz, in bursts
+    separated by 1.5 s of silence every speech_period seconds (speech-like, VAD-friendly).
+    """
+    video = (
+        f"testsrc2=size={width}x{height}:rate={fps}:duration={duration},"
+        f"hue=H=2.1*floor(t/{scene_seconds}),rotate='PI*mod(floor(t/{scene_seconds}),2)'"
+    )
+    audio = (
+        f"aevalsrc='0.4*sin(2*PI*180*t)*(0.5+0.5*sin(2*PI*4*t))*gt(mod(t,{speech_period}),1.5)'"
+        f":s=16000:d={duration}"
+    )
+    command = [
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "lavfi", "-i", video,
+        "-f", "lavfi", "-i", audio,
+        "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+        "-c:a", "aac",
+        "-shortest",
+        str(path)
+    ]
+    subprocess.run(command, check=True)
+    return str(path)
+
+
+def make_synthetic_wav(path, duration, speech_period=6):
+    """
+    Render the speech-like test signal as a 16 kHz mono PCM16 WAV (the Whisper input format).
+    """
+    audio = (
+        f"aevalsrc='0.4*sin(2*PI*180*t)*(0.5+0.5*sin(2*PI*4*t))*gt(mod(t,{speech_period}),1.5)'"
+        f":s=16000:d={duration}"
+    )
+    command = [
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "lavfi", "-i", audio,
+        "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1",
+        str(path)
+    ]
+    subprocess.run(command, check=True)
+    return str(path)
+
+
+# -------------------------------
+# Resource Measurement
+# -------------------------------
+def current_rss_bytes():
+    """Resident set size of this process (Linux /proc), falling back to the peak RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def process_cpu_seconds():
+    """CPU time of this process plus finished child processes (ffmpeg)."""
+    cpu = time.process_time()
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu += usage.ru_utime + usage.ru_stime
+    return cpu
+
+
+class RssSampler:
+    """
+    Samples this process's RSS in a background thread so peaks can be attributed to time spans.
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.samples.append((time.perf_counter(), current_rss_bytes()))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.samples.append((time.perf_counter(), current_rss_bytes()))
+
+    def peak_mb(self, start=None, end=None):
+        values = [rss for t, rss in self.samples if (start is None or t >= start) and (end is None or t <= end)]
+        return round(max(values, default=current_rss_bytes()) / (1024 * 1024), 1)
+
+
+class StageRecorder:
+    """
+    Collects wall time, CPU time and peak RSS per pipeline stage through metrics.add_stage_listener.
+    """
+
+    def __init__(self, sampler):
+        self.sampler = sampler
+        self.spans = []
+
+    def __call__(self, stage, start, end, cpu_seconds):
+        self.spans.append((stage, start, end, cpu_seconds))
+
+    def __enter__(self):
+        from metrics import add_stage_listener
+        add_stage_listener(self)
+        return self
+
+    def __exit__(self, *exc):
+        from metrics import remove_stage_listener
+        remove_stage_listener(self)
+
+    def summary(self):
+        stages = {}
+        for stage, start, end, cpu_seconds in self.spans:
+            entry = stages.setdefault(stage, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "peak_rss_mb": 0.0})
+            entry["calls"] += 1
+            entry["wall_seconds"] = round(entry["wall_seconds"] + end - start, 3)
+            entry["cpu_seconds"] = round(entry["cpu_seconds"] + cpu_seconds, 3)
+            entry["peak_rss_mb"] = max(entry["peak_rss_mb"], self.sampler.peak_mb(start, end))
+        return stages
+
+
+def measure(fn, *args, **kwargs):
+    """
+    Run fn once and return (output, {"wall_seconds", "cpu_seconds", "peak_rss_mb"}).
+    """
+    with RssSampler() as sampler:
+        cpu_start = process_cpu_seconds()
+        start = time.perf_counter()
+        output = fn(*args, **kwargs)
+        wall = time.perf_counter() - start
+        cpu = process_cpu_seconds() - cpu_start
+    return output, {
+        "wall_seconds": round(wall, 3),
+        "cpu_seconds": round(cpu, 3),
+        "peak_rss_mb": sampler.peak_mb(),
+    }
+
+
+# -------------------------------
+# Result Files
+# -------------------------------
+def git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, benchmark, config, runs):
+    """
+    Write benchmark results as JSON, tagged with the commit and machine they came from.
+    """
+    payload = {
+        "benchmark": benchmark,
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": config,
+        "runs": runs,
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"[INFO] Results written to {path}")
+    return payload
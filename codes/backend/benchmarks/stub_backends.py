@@ -0,0 +1,190 @@
+# stub_backends.py
+# Deterministic, model-free stand-ins for Whisper, BLIP, the sentence embedder,
+# Ollama (+ TTS) and Gemini, so the pipeline can be benchmarked offline.
+# Stubs keep the real functions' signatures and output formats; everything else
+# (ffmpeg ingest, scene detection, frame extraction, cleaning, FAISS, rendering) runs for real.
+import hashlib
+import inspect
+import re
+import subprocess
+import wave
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+import bench_utils  # noqa: F401  (puts the backend on sys.path)
+
+BACKENDS = ("whisper", "blip", "embeddings", "ollama", "gemini")
+
+SENTENCES = [
+    "Welcome everyone to this short overview of how the planet formed.",
+    "The early crust cooled slowly while oceans gathered in the basins.",
+    "Volcanic activity released gases that shaped the first atmosphere.",
+    "Single celled life appeared and changed the chemistry of the seas.",
+    "Continents drifted apart and collided many times over the ages.",
+    "Thanks for watching and see you in the next episode.",
+]
+
+
+# -------------------------------
+# Whisper
+# -------------------------------
+def stub_transcribe_audio(audio_path):
+    """One timestamped segment every 4 seconds of audio, in the transcribe_audio format."""
+    from segments import SegmentTable
+
+    with wave.open(audio_path, "rb") as wav:
+        duration = wav.getnframes() / wav.getframerate()
+
+    segments = []
+    start = 0.0
+    while start < duration:
+        end = min(start + 4.0, duration)
+        segments.append((start, end, SENTENCES[len(segments) % len(SENTENCES)]))
+        start = end
+    return SegmentTable.from_segments(segments)
+
+
+def stub_stream_transcription(audio_path, mode="chunked", backend="whisper_timestamped"):
+    """The stub transcript in batches of about 30 seconds, like stream_transcription's windows (mode and backend are ignored)."""
+    segments = stub_transcribe_audio(audio_path)
+    for i in range(0, len(segments), 8):
+        yield segments.take(np.arange(i, min(i + 8, len(segments))))
+
+
+# -------------------------------
+# BLIP
+# -------------------------------
+def _caption_for(image):
+    red, green, blue = image.reshape(-1, 3).mean(axis=0)
+    tone = max((red, "red"), (green, "green"), (blue, "blue"))[1]
+    brightness = "bright" if image.mean() > 110 else "dark"
+    return f"a {brightness} scene with mostly {tone} tones"
+
+
+def stub_generate_visual_descriptions(processor, model, device, frames, batch_size=None, cache=None, backend="torch"):
+    """
+    Caption each frame from its mean colour, in the generate_visual_descriptions format.
+    Same parameters as the real function (checked in stub_backends); batch_size, cache and backend are ignored.
+    """
+    descriptions = []
+    for frame in frames:
+        descriptions.append({"timestamp": round(frame["timestamp"], 2), "text": _caption_for(frame["image"])})
+    return descriptions
+
+
+def load_stub_blip():
+    return None, None, "cpu"
+
+
+# -------------------------------
+# Sentence embeddings
+# -------------------------------
+class StubEmbeddingModel:
+    """Hashed bag-of-words vectors with the all-MiniLM-L6-v2 dimension."""
+
+    dim = 384
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                bucket = int.from_bytes(hashlib.md5(word.encode()).digest()[:4], "little") % self.dim
+                embeddings[row, bucket] += 1.0
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-6)
+
+
+# -------------------------------
+# Ollama + TTS
+# -------------------------------
+def stub_summarize_text(transcript, duration_seconds, wpm, model="llama3.2:latest"):
+    """Truncate the transcript to the word budget the real prompt asks for."""
+    if not transcript:
+        return None
+    target_word_count = max(1, int((duration_seconds / 60) * wpm))
+    return " ".join(transcript.split()[:target_word_count])
+
+
+def stub_create_timed_audio(text, duration_seconds, filename="summary_audio.mp3"):
+    """Write a tone of the requested duration instead of synthesising speech."""
+    if not text:
+        return
+    subprocess.run(
+        ["ffmpeg", "-y", "-v", "error", "-f", "lavfi",
+         "-i", f"sine=frequency=300:duration={duration_seconds}", filename],
+        check=True
+    )
+
+
+# -------------------------------
+# Gemini
+# -------------------------------
+def stub_generate_timestamps_with_gemini(video_path, max_length=70, min_length=60):
+    """Evenly spaced 5 second clips adding up to roughly the middle of the length range."""
+    cap = cv2.VideoCapture(video_path)
+    duration = cap.get(cv2.CAP_PROP_FRAME_COUNT) / (cap.get(cv2.CAP_PROP_FPS) or 25)
+    cap.release()
+
+    target = min((min_length + max_length) / 2, duration)
+    clip_count = max(1, int(target // 5))
+    step = duration / clip_count
+    timestamps = [[round(i * step, 2), round(min(i * step + 5, duration), 2)] for i in range(clip_count)]
+    return timestamps, sum(end - start for start, end in timestamps)
+
+
+# -------------------------------
+# Installation
+# -------------------------------
+@contextmanager
+def stub_backends(names=BACKENDS):
+    """
+    Replace the named backends with stubs for the duration of the block.
+    Names not listed keep their real implementation (and need their models/services).
+    """
+    import main
+    import get_description_from_blip
+    from model_registry import model_registry
+
+    unknown = set(names) - set(BACKENDS)
+    if unknown:
+        raise ValueError(f"Unknown backends: {sorted(unknown)}")
+
+    patches = []
+    if "whisper" in names:
+        patches.append((main, "stream_transcription", stub_stream_transcription))
+    if "blip" in names:
+        patches.append((get_description_from_blip, "generate_visual_descriptions", stub_generate_visual_descriptions))
+    if "ollama" in names:
+        patches.append((main, "summarize_text", stub_summarize_text))
+        patches.append((main, "create_timed_audio", stub_create_timed_audio))
+    if "gemini" in names:
+        patches.append((main, "generate_timestamps_with_gemini", stub_generate_timestamps_with_gemini))
+
+    loaders = []
+    if "blip" in names:
+        loaders.append(("blip", load_stub_blip))
+        loaders.append(("blip_int8", load_stub_blip))
+    if "embeddings" in names:
+        loaders.append(("sentence_transformer", StubEmbeddingModel))
+
+    originals = [(module, attr, getattr(module, attr)) for module, attr, _ in patches]
+    # A stub must accept whatever callers pass to the real function
+    for (module, attr, real), (_, _, stub) in zip(originals, patches):
+        if list(inspect.signature(real).parameters) != list(inspect.signature(stub).parameters):
+            raise TypeError(f"{stub.__name__} does not match the signature of {module.__name__}.{attr}")
+    original_loaders = [(name, model_registry._loaders[name]) for name, _ in loaders]
+    try:
+        for module, attr, stub in patches:
+            setattr(module, attr, stub)
+        for name, loader in loaders:
+            model_registry.evict(name)
+            model_registry.register(name, loader)
+        yield
+    finally:
+        for module, attr, original in originals:
+            setattr(module, attr, original)
+        for name, loader in original_loaders:
+            model_registry.evict(name)
+            model_registry.register(name, loader)
@@ -0,0 +1,116 @@
+# caption_cache.py
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Import centralized configuration
+from config import CAPTION_CACHE_ENABLED, CAPTION_CACHE_PATH, CAPTION_CACHE_MAX_ENTRIES
+from metrics import metrics
+
+CAPTION_CACHE_REQUESTS = metrics.counter(
+    "teaser_caption_cache_requests_total",
+    "Caption cache lookups per frame, by result (hit or miss).",
+    ["result"]
+)
+
+
+# -------------------------------
+# Caption Cache
+# -------------------------------
+class CaptionCache:
+    """
+    Captions of previously seen frames, kept across videos in a SQLite file and keyed by the
+    frame's perceptual hash plus the captioning model. Re-uploads, trailers and episodes that
+    share intros, logos and title cards get those captions without running the model.
+    Once more than max_entries are stored, the least recently used ones are evicted.
+    """
+
+    def __init__(self, db_path=CAPTION_CACHE_PATH, max_entries=CAPTION_CACHE_MAX_ENTRIES, enabled=CAPTION_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+        if self.enabled:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS captions (
+                        model TEXT NOT NULL,
+                        hash TEXT NOT NULL,
+                        caption TEXT NOT NULL,
+                        last_used REAL NOT NULL,
+                        PRIMARY KEY (model, hash)
+                    )
+                    """
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS captions_last_used ON captions (last_used)")
+
+    def get_many(self, model, frame_hashes):
+        """Return {frame_hash: caption} for the hashes in the cache, marking them as recently used."""
+        if not self.enabled or not frame_hashes:
+            return {}
+        keys = [f"{frame_hash:016x}" for frame_hash in frame_hashes]
+        found = {}
+        with self._lock, self._conn:
+            for first in range(0, len(keys), 500):  # stay below SQLite's variable limit
+                chunk = keys[first:first + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = self._conn.execute(
+                    f"SELECT hash, caption FROM captions WHERE model = ? AND hash IN ({placeholders})", (model, *chunk)
+                ).fetchall()
+                found.update(rows)
+            if found:
+                self._conn.executemany(
+                    "UPDATE captions SET last_used = ? WHERE model = ? AND hash = ?",
+                    [(time.time(), model, key) for key in found]
+                )
+            hits = sum(key in found for key in keys)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        result = {frame_hash: found[key] for frame_hash, key in zip(frame_hashes, keys) if key in found}
+        CAPTION_CACHE_REQUESTS.inc(hits, result="hit")
+        CAPTION_CACHE_REQUESTS.inc(len(keys) - hits, result="miss")
+        return result
+
+    def put_many(self, model, captions):
+        """Store {frame_hash: caption} and evict the least recently used entries over max_entries."""
+        if not self.enabled or not captions:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO captions (model, hash, caption, last_used) VALUES (?, ?, ?, ?)",
+                [(model, f"{frame_hash:016x}", caption, now) for frame_hash, caption in captions.items()]
+            )
+            excess = self._conn.execute("SELECT COUNT(*) FROM captions").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM captions WHERE rowid IN (SELECT rowid FROM captions ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        if not self.enabled:
+            return 0
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM captions").fetchone()[0]
+
+
+# Process-wide cache shared by all jobs
+caption_cache = CaptionCache()
+
+metrics.gauge(
+    "teaser_caption_cache_hit_ratio",
+    "Share of caption cache lookups since startup that found a caption.",
+    fn=caption_cache.hit_rate
+)
@@ -17,17 +17,91 @@ AWS_REGION = os.getenv("AWS_REGION")
 BUCKET_NAME = os.getenv("BUCKET_NAME")
 
 # Model configuration
-WHISPER_MODEL = "small"
-BLIP_MODEL = "Salesforce/blip-image-captioning-large"
-SENTENCE_TRANSFORMER_MODEL = 'all-MiniLM-L6-v2'
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small")
+BLIP_MODEL = os.getenv("BLIP_MODEL", "Salesforce/blip-image-captioning-large")
+SENTENCE_TRANSFORMER_MODEL = os.getenv("SENTENCE_TRANSFORMER_MODEL", 'all-MiniLM-L6-v2')
+SAVE_INDEXES = os.getenv("SAVE_INDEXES", "false").lower() == "true"  # also write each job's embeddings + mappings under INDEXES_DIR
+
+# Captioning configuration
+BLIP_BACKEND = os.getenv("BLIP_BACKEND", "torch")  # or "torch_int8" (dynamic int8 quantization, CPU)
+BLIP_BATCH_SIZE = int(os.getenv("BLIP_BATCH_SIZE", "0"))  # frames per generate call; 0 = sized from free memory
+BLIP_MAX_BATCH_SIZE = int(os.getenv("BLIP_MAX_BATCH_SIZE", "16"))  # cap for the automatic size
+FRAME_EXTRACTION_MODE = os.getenv("FRAME_EXTRACTION_MODE", "auto")  # "seek", "scan" (one decode pass) or "auto"
+FRAME_SCAN_MAX_GAP_SECONDS = float(os.getenv("FRAME_SCAN_MAX_GAP_SECONDS", "5"))  # auto scans when targets are closer on average
+FRAME_DEDUPE_ENABLED = os.getenv("FRAME_DEDUPE_ENABLED", "true").lower() == "true"  # near-duplicate frames reuse a caption
+FRAME_DEDUPE_MAX_DISTANCE = int(os.getenv("FRAME_DEDUPE_MAX_DISTANCE", "4"))  # dHash bits (of 64) that may differ
+SAVE_FRAMES = os.getenv("SAVE_FRAMES", "false").lower() == "true"  # also export captioned frames as JPEGs under FRAMES_DIR
+
+# Model registry configuration
+MODEL_MEMORY_BUDGET_MB = int(os.getenv("MODEL_MEMORY_BUDGET_MB", "4096"))
+PRELOAD_MODELS = [name.strip() for name in os.getenv("PRELOAD_MODELS", "").split(",") if name.strip()]
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "false").lower() == "true"  # import the pipeline at API startup
+
+# Transcription configuration
+TRANSCRIBE_BACKEND = os.getenv("TRANSCRIBE_BACKEND", "whisper_timestamped")  # or "faster_whisper" (CTranslate2)
+FASTER_WHISPER_COMPUTE_TYPE = os.getenv("FASTER_WHISPER_COMPUTE_TYPE", "int8")  # CTranslate2 weight type
+TRANSCRIBE_MODE = os.getenv("TRANSCRIBE_MODE", "chunked")  # "chunked" (VAD + parallel windows) or "single" (one Whisper call)
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "2"))  # worker processes, each holding its own Whisper model
+TRANSCRIBE_WINDOW_SECONDS = float(os.getenv("TRANSCRIBE_WINDOW_SECONDS", "30"))
+TRANSCRIBE_OVERLAP_SECONDS = float(os.getenv("TRANSCRIBE_OVERLAP_SECONDS", "2"))
+TRANSCRIBE_LANGUAGE = os.getenv("TRANSCRIBE_LANGUAGE") or None  # None: detect on the first window, then pin it
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+VAD_MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", "10"))  # speech = frames this far above the noise floor
+VAD_MIN_SILENCE_SECONDS = float(os.getenv("VAD_MIN_SILENCE_SECONDS", "0.5"))  # shorter pauses are kept
+
+# Text cleaning configuration (comma-separated, matched case-insensitively as whole words)
+TRANSCRIPT_FILLERS = [w.strip() for w in os.getenv("TRANSCRIPT_FILLERS", "um,uh,you know,like,actually").split(",") if w.strip()]
+CAPTION_PREFIXES = [
+    w.strip() for w in os.getenv(
+        "CAPTION_PREFIXES", "there is a,there is an,there is,there are,a close up of,a picture of,arafed,araffes"
+    ).split(",") if w.strip()
+]  # stripped from the start of BLIP captions
 
 # Path configuration
 BASE_DIR = Path(__file__).parent
-DOWNLOAD_DIR = BASE_DIR / "downloads"
-OUTPUT_DIR = BASE_DIR / "output"
+DOWNLOAD_DIR = Path(os.getenv("DOWNLOAD_DIR", str(BASE_DIR / "downloads")))
+OUTPUT_DIR = Path(os.getenv("OUTPUT_DIR", str(BASE_DIR / "output")))
 FRAMES_DIR = OUTPUT_DIR / "frames"
+INDEXES_DIR = OUTPUT_DIR / "indexes"
 
 # Create directories
-DOWNLOAD_DIR.mkdir(exist_ok=True)
-OUTPUT_DIR.mkdir(exist_ok=True)
-FRAMES_DIR.mkdir(exist_ok=True)
\ No newline at end of file
+DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+FRAMES_DIR.mkdir(exist_ok=True)
+
+# Job queue configuration
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "memory")  # "memory" or "sqlite"
+JOB_QUEUE_DB_PATH = os.getenv("JOB_QUEUE_DB_PATH", str(OUTPUT_DIR / "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "16"))
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", "86400"))  # in-memory store: finished jobs kept this long
+JOB_MAX_FINISHED = int(os.getenv("JOB_MAX_FINISHED", "1000"))  # in-memory store: at most this many finished jobs
+
+# Artifact cache configuration
+ARTIFACT_CACHE_ENABLED = os.getenv("ARTIFACT_CACHE_ENABLED", "true").lower() == "true"
+ARTIFACT_CACHE_DIR = Path(os.getenv("ARTIFACT_CACHE_DIR", str(OUTPUT_DIR / "cache")))
+ARTIFACT_CACHE_MAX_SIZE_MB = int(os.getenv("ARTIFACT_CACHE_MAX_SIZE_MB", "2048"))
+
+# Caption cache configuration (captions reused across videos, keyed by perceptual frame hash)
+CAPTION_CACHE_ENABLED = os.getenv("CAPTION_CACHE_ENABLED", "true").lower() == "true"
+CAPTION_CACHE_PATH = Path(os.getenv("CAPTION_CACHE_PATH", str(OUTPUT_DIR / "caption_cache.sqlite3")))
+CAPTION_CACHE_MAX_ENTRIES = int(os.getenv("CAPTION_CACHE_MAX_ENTRIES", "200000"))  # least recently used evicted above this
+
+# Ingestion configuration (single decode -> Whisper WAV + proxy video + scene scores)
+PROXY_HEIGHT = int(os.getenv("PROXY_HEIGHT", "384"))
+SCENE_SCORE_THRESHOLD = float(os.getenv("SCENE_SCORE_THRESHOLD", "0.1"))  # ffmpeg scene score, 0-1
+SCENE_DETECTION_MODE = os.getenv("SCENE_DETECTION_MODE", "fast")  # without ingest scores: "fast" (downscaled, strided) or "full" (PySceneDetect)
+SCENE_DETECTION_STRIDE = int(os.getenv("SCENE_DETECTION_STRIDE", "5"))  # fast mode scores every Nth frame
+SCENE_DETECTION_HEIGHT = int(os.getenv("SCENE_DETECTION_HEIGHT", "144"))  # fast mode analysis resolution
+FALLBACK_FRAME_BUDGET = int(os.getenv("FALLBACK_FRAME_BUDGET", "24"))  # frames sampled by visual change when no cut is found; 0 = every 5 s
+
+# Upload spooling configuration (uploads are streamed into the job workspace)
+UPLOAD_BUFFER_MB = int(os.getenv("UPLOAD_BUFFER_MB", "4"))  # size of each disk write
+UPLOAD_EARLY_INGEST = os.getenv("UPLOAD_EARLY_INGEST", "true").lower() == "true"  # ingest streamable uploads while they arrive
+
+# S3 transfer configuration
+S3_BACKEND = os.getenv("S3_BACKEND", "aws")  # "aws" or "local" (filesystem-backed stand-in)
+S3_LOCAL_DIR = Path(os.getenv("S3_LOCAL_DIR", str(OUTPUT_DIR / "s3")))
+S3_UPLOAD_WORKERS = int(os.getenv("S3_UPLOAD_WORKERS", "4"))
+S3_MAX_CONCURRENCY = int(os.getenv("S3_MAX_CONCURRENCY", "10"))
+S3_MULTIPART_CHUNK_MB = int(os.getenv("S3_MULTIPART_CHUNK_MB", "16"))
@@ -0,0 +1,49 @@
+# frame_hash.py
+import cv2
+import numpy as np
+
+# Import centralized configuration
+from config import FRAME_DEDUPE_MAX_DISTANCE
+
+
+# -------------------------------
+# Perceptual Hashing
+# -------------------------------
+def dhash(image, hash_size=8):
+    """
+    Difference hash of an RGB (or grayscale) frame as a hash_size**2-bit int: the frame is
+    shrunk to (hash_size + 1) x hash_size grey pixels and each bit says whether a pixel
+    is brighter than its right-hand neighbour. Robust to scaling, compression and small colour shifts.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+# -------------------------------
+# Near-duplicate Frames
+# -------------------------------
+def dedupe_frames(frames, max_distance=FRAME_DEDUPE_MAX_DISTANCE):
+    """
+    Split frames into the ones that need a caption and the ones that can reuse one.
+    Each frame gets a 'hash'; a frame within max_distance bits of an earlier kept frame reuses its caption.
+    Returns (kept frames, sources) where sources[i] is the index in kept whose caption frames[i] uses.
+    """
+    kept, kept_hashes, sources = [], [], []
+    for frame in frames:
+        frame["hash"] = dhash(frame["image"])
+        match = next(
+            (j for j, kept_hash in enumerate(kept_hashes) if hamming_distance(frame["hash"], kept_hash) <= max_distance),
+            None
+        )
+        if match is None:
+            match = len(kept)
+            kept.append(frame)
+            kept_hashes.append(frame["hash"])
+        sources.append(match)
+    return kept, sources
@@ -1,5 +1,4 @@
 # gemini_for_timestamps.py
-import google.generativeai as genai
 import os
 import time
 import re
@@ -9,12 +8,21 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # --- Configuration ---
-api_key = os.getenv("GEMINI_API_KEY")
+_genai = None
 
-if not api_key:
-    raise ValueError("GEMINI_API_KEY not found. Please create a .env file and add it.")
+def get_genai():
+    """Import and configure the Gemini client on first use (the API key is only required then)."""
+    global _genai
+    if _genai is None:
+        api_key = os.getenv("GEMINI_API_KEY")
 
-genai.configure(api_key=api_key)
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found. Please create a .env file and add it.")
+
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        _genai = genai
+    return _genai
 
 # --- Function: Get Video Duration ---
 def get_video_duration(video_path):
@@ -124,6 +132,7 @@ def generate_timestamps_with_gemini(video_path, max_length=70, min_length=60):
                timestamps: List of [start, end] pairs in seconds
                total_duration: Sum of all clip durations
     """
+    genai = get_genai()
     chunk_duration_seconds = 1800  # 30 minutes
 
     duration = get_video_duration(video_path)
@@ -3,57 +3,256 @@
 # -------------------------------
 import os
 import json
-import torch
+import subprocess
+from collections import deque
+
 import cv2
+import numpy as np
 from PIL import Image
-from transformers import BlipProcessor, BlipForConditionalGeneration
-from scenedetect import VideoManager, SceneManager
-from scenedetect.detectors import ContentDetector
+
+# Import centralized configuration
+from config import (
+    BLIP_MODEL, BLIP_BACKEND, BLIP_BATCH_SIZE, BLIP_MAX_BATCH_SIZE, FRAME_EXTRACTION_MODE, FRAME_SCAN_MAX_GAP_SECONDS,
+    SCENE_DETECTION_MODE, SCENE_DETECTION_STRIDE, SCENE_DETECTION_HEIGHT, FALLBACK_FRAME_BUDGET,
+    FRAME_DEDUPE_ENABLED
+)
+from model_registry import model_registry
+from caption_cache import caption_cache
+from frame_hash import dhash, dedupe_frames
+from ingest_video import detect_scenes_from_scores, read_scene_scores
+from metrics import metrics, time_stage
+from segments import SegmentTable
+
+CAPTION_FRAMES = metrics.counter(
+    "teaser_caption_frames_total",
+    "Frames that got a caption, by where it came from (model inference, the caption cache or a near-duplicate frame).",
+    ["source"]
+)
 
 
 # -------------------------------
 # Scene Detection with PySceneDetect
 # -------------------------------
-def detect_scenes(video_path, threshold=12.0):
+def detect_scenes_pyscenedetect(video_path, threshold=12.0):
     """
     Detect scene change timestamps (in seconds) using PySceneDetect.
     """
-    video_manager = VideoManager([video_path])
+    from scenedetect import open_video, SceneManager
+    from scenedetect.detectors import ContentDetector
+
+    video = open_video(video_path)
     scene_manager = SceneManager()
     scene_manager.add_detector(ContentDetector(threshold=threshold))
 
-    video_manager.start()
-    scene_manager.detect_scenes(frame_source=video_manager)
+    scene_manager.detect_scenes(video=video)
     scene_list = scene_manager.get_scene_list()
 
     return [start.get_seconds() for start, _ in scene_list]
 
 
-def extract_frames(video_path, timestamps, output_dir="frames"):
+# -------------------------------
+# Fast Scene Detection (downscaled, strided)
+# -------------------------------
+def _hsv_planes(frame):
+    return [plane.astype(np.int16) for plane in cv2.split(cv2.cvtColor(frame, cv2.COLOR_BGR2HSV))]
+
+
+def _content_score(previous, current):
+    """PySceneDetect's ContentDetector score: mean absolute hue, saturation and value change."""
+    return sum(np.abs(a - b).mean() for a, b in zip(previous, current)) / 3
+
+
+def _refine_cut(recent, threshold):
     """
-    Extract frames from video at given timestamps.
-    Returns a list of dicts: [{'timestamp': float, 'path': str}, ...]
+    Find the exact cut among the frames decoded since the previous sample: the frame with
+    the largest change from the one before it. None when no single step reaches the threshold
+    (a gradual change, which ContentDetector would not cut either).
     """
-    os.makedirs(output_dir, exist_ok=True)
-    cap = cv2.VideoCapture(video_path)
+    planes = [_hsv_planes(frame) for _, frame in recent]
+    scores = [_content_score(a, b) for a, b in zip(planes, planes[1:])]
+    best = int(np.argmax(scores))
+    return recent[best + 1][0] if scores[best] >= threshold else None
+
 
+def _small_frames(video_path, height, pix_fmt="bgr24", every=1):
+    """
+    Decode video_path with ffmpeg at `height` pixels (scaled before the pixel format conversion,
+    with the deblocking filter skipped, which keeps the decode cheap).
+    Returns (fps, frames): frames yields (frame_num, array) for every `every`-th frame.
+    Raises ValueError when the frame size cannot be read (no or broken video stream).
+    -vsync (rather than its ffmpeg 5.1+ replacement -fps_mode) keeps older ffmpeg builds working.
+    """
+    cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         raise FileNotFoundError(f"Error: Could not open video file {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25
+    source_width, source_height = cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+    cap.release()
+    if source_width <= 0 or source_height <= 0:
+        raise ValueError(f"No readable video stream size in {video_path}")
+
+    height = int(min(height, source_height)) // 2 * 2
+    width = max(2, int(round(source_width * height / source_height / 2)) * 2)
+    channels = 1 if pix_fmt == "gray" else 3
+    select = f"select='not(mod(n,{every}))'," if every > 1 else ""
+    command = [
+        "ffmpeg", "-v", "error", "-nostdin", "-skip_loop_filter", "all", "-flags2", "fast", "-i", video_path,
+        "-an", "-sn", "-vf", f"{select}scale={width}:{height}:flags=area", "-vsync", "passthrough",
+        "-pix_fmt", pix_fmt, "-f", "rawvideo", "pipe:1"
+    ]
+
+    def frames():
+        frame_bytes = width * height * channels
+        shape = (height, width) if channels == 1 else (height, width, channels)
+        count = 0
+        with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as process:
+            while True:
+                data = process.stdout.read(frame_bytes)
+                if len(data) < frame_bytes:
+                    break
+                yield count * every, np.frombuffer(data, dtype=np.uint8).reshape(shape)
+                count += 1
+        if process.returncode and count == 0:
+            raise subprocess.CalledProcessError(process.returncode, command)
+
+    return fps, frames()
+
+
+def detect_scenes_fast(video_path, threshold=12.0, stride=SCENE_DETECTION_STRIDE, height=SCENE_DETECTION_HEIGHT,
+                       min_scene_len=15):
+    """
+    Detect scene change timestamps (in seconds) with ContentDetector's score, but on a
+    stream ffmpeg decodes at `height` pixels and scoring only every `stride`-th frame.
+    When a sample differs from the previous one by threshold or more, the frames in between
+    (kept in a small ring buffer) are scored to place the cut on the exact frame.
+    Like PySceneDetect: an empty list when there is no cut, otherwise every scene start including 0.0.
+    """
+    fps, frames = _small_frames(video_path, height)
 
-    frames = []
+    recent = deque(maxlen=stride + 1)  # the frames since the previous sample, and that sample
+    previous = None
+    cuts = []
+
+    def sample():
+        nonlocal previous
+        planes = _hsv_planes(recent[-1][1])
+        if previous is not None and _content_score(previous, planes) >= threshold:
+            cut = _refine_cut(list(recent), threshold)
+            if cut is not None and cut - (cuts[-1] if cuts else 0) >= min_scene_len:
+                cuts.append(cut)
+        previous = planes
+        # Keep only this sample; the next refinement starts from it
+        last = recent[-1]
+        recent.clear()
+        recent.append(last)
+
+    frame_num = -1
+    for frame_num, frame in frames:
+        recent.append((frame_num, frame))
+        if frame_num % stride == 0:
+            sample()
+    if frame_num > 0 and frame_num % stride:
+        sample()  # the tail after the last full stride
+
+    return [0.0] + [cut / fps for cut in cuts] if cuts else []
+
+
+def detect_scenes(video_path, threshold=12.0, mode=SCENE_DETECTION_MODE):
+    """
+    Detect scene change timestamps (in seconds): "fast" (detect_scenes_fast) or "full" (PySceneDetect).
+    """
+    if mode == "full":
+        return detect_scenes_pyscenedetect(video_path, threshold)
+    try:
+        return detect_scenes_fast(video_path, threshold)
+    except ValueError as e:
+        print(f"[INFO] Fast scene detection unavailable ({e}); using PySceneDetect")
+        return detect_scenes_pyscenedetect(video_path, threshold)
+
+
+def _seek_frames(cap, timestamps):
+    """Seek to every timestamp; each seek re-decodes from the previous keyframe. Yields (index, BGR frame)."""
     for i, ts in enumerate(timestamps):
         cap.set(cv2.CAP_PROP_POS_MSEC, ts * 1000)
         ret, frame = cap.read()
         if ret:
-            frame_path = os.path.join(output_dir, f"frame_{i:04d}_{ts:.2f}.jpg")
-            cv2.imwrite(frame_path, frame)
-            frames.append({"timestamp": ts, "path": frame_path})
+            yield i, frame
+
+
+def _scan_frames(cap, timestamps, fps):
+    """
+    One forward pass from the first target: grab() every frame (no colour conversion)
+    and retrieve() only the target frames. Yields (index, BGR frame) in timeline order.
+    """
+    targets = sorted((int(ts * fps + 0.5), i) for i, ts in enumerate(timestamps))
+    if not targets:
+        return
+    cap.set(cv2.CAP_PROP_POS_FRAMES, targets[0][0])
+    position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    frame = None
+    for target, i in targets:
+        while position <= target:
+            if not cap.grab():
+                return
+            position += 1
+            frame = None
+        if frame is None:
+            ret, frame = cap.retrieve()
+            if not ret:
+                return
+        yield i, frame
+
+
+def choose_extraction_mode(timestamps, mode=FRAME_EXTRACTION_MODE, max_gap_seconds=FRAME_SCAN_MAX_GAP_SECONDS):
+    """
+    "seek" or "scan" for these targets. In auto mode a scan is chosen when the targets are on average
+    closer together than max_gap_seconds, i.e. when decoding every frame between them costs less
+    than re-decoding a keyframe interval per seek.
+    """
+    if mode != "auto":
+        return mode
+    if len(timestamps) < 2:
+        return "seek"
+    span = max(timestamps) - min(timestamps)
+    return "scan" if span / (len(timestamps) - 1) < max_gap_seconds else "seek"
+
+
+def extract_frames(video_path, timestamps, output_dir=None, mode=FRAME_EXTRACTION_MODE):
+    """
+    Extract frames from video at given timestamps, kept in memory as RGB uint8 arrays.
+    mode is "seek" (one seek per timestamp), "scan" (one forward pass) or "auto" (by target density).
+    When output_dir is given (debug/export) the frames are also written there as JPEGs.
+    Returns a list of dicts in the order of timestamps: [{'timestamp': float, 'image': np.ndarray}, ...] ('path' too when exported)
+    """
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    cap = cv2.VideoCapture(video_path)
+
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Error: Could not open video file {video_path}")
+
+    timestamps = list(timestamps)
+    mode = choose_extraction_mode(timestamps, mode)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if mode == "scan" and fps > 0:
+        decoded = _scan_frames(cap, timestamps, fps)
+    else:
+        decoded = _seek_frames(cap, timestamps)
+
+    frames = {}
+    for i, frame in decoded:
+        ts = timestamps[i]
+        entry = {"timestamp": ts, "image": cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)}
+        if output_dir:
+            entry["path"] = os.path.join(output_dir, f"frame_{i:04d}_{ts:.2f}.jpg")
+            cv2.imwrite(entry["path"], frame)
+        frames[i] = entry
 
     cap.release()
-    return frames
+    return [frames[i] for i in sorted(frames)]
 
 
-def fallback_frame_extraction(video_path, interval=5, output_dir="frames"):
+def fallback_frame_extraction(video_path, interval=5, output_dir=None):
     """
     Extract frames every N seconds as fallback when scene detection fails.
     """
@@ -67,59 +266,239 @@ def fallback_frame_extraction(video_path, interval=5, output_dir="frames"):
     return extract_frames(video_path, timestamps, output_dir)
 
 
+# -------------------------------
+# Adaptive Fallback Sampling
+# -------------------------------
+def motion_signal(video_path, stride=SCENE_DETECTION_STRIDE, height=SCENE_DETECTION_HEIGHT):
+    """
+    Cheap visual-change signal: mean absolute grey-level difference between consecutive
+    sampled frames of a downscaled stream (every `stride`-th frame).
+    Returns (times, differences) as arrays, each difference stamped with the later frame's time.
+    """
+    fps, frames = _small_frames(video_path, height, pix_fmt="gray", every=stride)
+    times, differences = [], []
+    previous = None
+    for frame_num, frame in frames:
+        current = frame.astype(np.int16)
+        if previous is not None:
+            times.append(frame_num / fps)
+            differences.append(np.abs(current - previous).mean())
+        previous = current
+    return np.array(times), np.array(differences)
+
+
+def budget_timestamps(times, activity, budget, floor=0.25):
+    """
+    Spend a budget of frames where the video changes most: timestamps are placed at equal steps
+    of cumulative activity, so a montage gets many frames and a static lecture few.
+    floor (a share of the mean activity added everywhere) keeps static stretches from going unsampled.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    activity = np.asarray(activity, dtype=np.float64)
+    if not len(times) or budget <= 0:
+        return []
+    weights = activity + floor * activity.mean() + 1e-9
+    cumulative = np.cumsum(weights) / weights.sum()
+    positions = np.searchsorted(cumulative, (np.arange(budget) + 0.5) / budget)
+    return sorted({round(float(times[i]), 2) for i in np.minimum(positions, len(times) - 1)})
+
+
+def adaptive_frame_extraction(video_path, budget=FALLBACK_FRAME_BUDGET, output_dir=None, scene_scores_path=None):
+    """
+    Fallback when scene detection finds no cut: extract `budget` frames placed by visual change,
+    so captioning cost depends on the budget, not on the length of the video.
+    The ingest scene scores are the change signal when available; otherwise it is computed
+    from a downscaled stream. A budget of 0 keeps the fixed 5 second interval.
+    """
+    if budget <= 0:
+        return fallback_frame_extraction(video_path, output_dir=output_dir)
+    if scene_scores_path and os.path.exists(scene_scores_path):
+        scores = read_scene_scores(scene_scores_path)
+        times, activity = [pts_time for pts_time, _ in scores], [score for _, score in scores]
+    else:
+        try:
+            times, activity = motion_signal(video_path)
+        except ValueError as e:
+            print(f"[INFO] No visual-change signal ({e}); sampling every 5 s")
+            times, activity = [], []
+    timestamps = budget_timestamps(times, activity, budget)
+    if not timestamps:
+        return fallback_frame_extraction(video_path, output_dir=output_dir)
+    print(f"[INFO] No scene cuts; sampling {len(timestamps)} frames by visual change")
+    return extract_frames(video_path, timestamps, output_dir)
+
+
 # -------------------------------
 # BLIP Caption Generation
 # -------------------------------
-def load_blip_model():
+def load_blip_model(device=None):
     """
-    Load BLIP image captioning model (large version).
+    Load the BLIP image captioning model named by config.BLIP_MODEL.
     """
-    processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-large", use_fast=True)
-    model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-large")
-    device = "cuda" if torch.cuda.is_available() else "cpu"
+    import torch
+    from transformers import BlipProcessor, BlipForConditionalGeneration
+
+    processor = BlipProcessor.from_pretrained(BLIP_MODEL, use_fast=True)
+    model = BlipForConditionalGeneration.from_pretrained(BLIP_MODEL)
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
     model.to(device)
     return processor, model, device
 
 
-def generate_visual_descriptions(processor, model, device, frames):
+def load_blip_int8_model():
+    """
+    Load config.BLIP_MODEL with its Linear layers dynamically quantized to int8 (CPU only):
+    weights are stored as int8 and activations quantized on the fly, which speeds up the
+    matrix multiplies that dominate BLIP on CPU-only nodes.
     """
-    Generate visual captions for each frame.
+    import torch
+
+    processor, model, device = load_blip_model(device="cpu")
+    model = torch.ao.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+    return processor, model, device
+
+
+# Captioning backend -> model_registry name of its (processor, model, device)
+BLIP_BACKENDS = {"torch": "blip", "torch_int8": "blip_int8"}
+
+
+def blip_model_name(backend=BLIP_BACKEND):
+    try:
+        return BLIP_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown BLIP backend: {backend}") from None
+
+
+def caption_model_key(backend=BLIP_BACKEND):
+    """Identifies whose captions these are in the caption cache (fp32 entries keep the plain model name)."""
+    return BLIP_MODEL if backend == "torch" else f"{BLIP_MODEL}:{backend}"
+
+
+# Rough peak memory of one 384x384 frame inside generate() for blip-image-captioning-large in fp32
+# (vision activations plus the text decoder's cross-attention cache)
+MEMORY_PER_FRAME_MB = 200
+
+
+def available_memory_mb(device):
+    """Free memory on the device the model runs on, or None when it cannot be read."""
+    if device == "cuda":
+        import torch
+        return torch.cuda.mem_get_info()[0] / (1024 * 1024)
+    try:
+        import psutil
+        return psutil.virtual_memory().available / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def caption_batch_size(device, batch_size=BLIP_BATCH_SIZE, max_batch_size=BLIP_MAX_BATCH_SIZE):
+    """
+    Frames per generate() call: batch_size when set, otherwise as many frames as fit
+    in half of the free memory, between 1 and max_batch_size.
+    """
+    if batch_size > 0:
+        return batch_size
+    free_mb = available_memory_mb(device)
+    if free_mb is None:
+        return min(4, max_batch_size)
+    return max(1, min(max_batch_size, int(free_mb / 2 // MEMORY_PER_FRAME_MB)))
+
+
+def generate_visual_descriptions(processor, model, device, frames, batch_size=None, cache=None, backend=BLIP_BACKEND):
+    """
+    Generate visual captions for the frames, batch_size frames per generate() call
+    (None: see caption_batch_size). Frames are the in-memory RGB arrays from extract_frames.
+    With a CaptionCache, frames whose perceptual hash is cached skip the model, and new captions are stored
+    under the captioning backend's key.
     Returns a list of dicts: [{'timestamp': float, 'text': str}, ...]
     """
-    descriptions = []
-    for frame in frames:
-        image = Image.open(frame["path"]).convert("RGB")
-        inputs = processor(images=image, return_tensors="pt").to(device)
+    cached = {}
+    if cache is not None and cache.enabled:
+        for frame in frames:
+            frame.setdefault("hash", dhash(frame["image"]))
+        cached = cache.get_many(caption_model_key(backend), [frame["hash"] for frame in frames])
+        CAPTION_FRAMES.inc(sum(frame["hash"] in cached for frame in frames), source="cache")
+    pending = [frame for frame in frames if frame.get("hash") not in cached]
+
+    if batch_size is None:
+        batch_size = caption_batch_size(device)
+    if pending:
+        print(f"[INFO] Captioning {len(pending)} frames in batches of {batch_size}"
+              + (f" ({len(frames) - len(pending)} from the caption cache)" if cached else ""))
+
+    captions = {}
+    for first in range(0, len(pending), batch_size):
+        batch = pending[first:first + batch_size]
+        images = [Image.fromarray(frame["image"]) for frame in batch]
+        inputs = processor(images=images, return_tensors="pt").to(device)
         output = model.generate(**inputs, max_new_tokens=50)
-        caption = processor.decode(output[0], skip_special_tokens=True)
-        descriptions.append({"timestamp": round(frame["timestamp"], 2), "text": caption})
+        for frame, caption in zip(batch, processor.batch_decode(output, skip_special_tokens=True)):
+            captions[id(frame)] = caption
+    CAPTION_FRAMES.inc(len(pending), source="model")
+
+    if cache is not None and pending:
+        cache.put_many(caption_model_key(backend), {frame["hash"]: captions[id(frame)] for frame in pending if "hash" in frame})
 
-    return descriptions
+    return [
+        {"timestamp": round(frame["timestamp"], 2), "text": captions[id(frame)] if id(frame) in captions else cached[frame["hash"]]}
+        for frame in frames
+    ]
 
 
 # -------------------------------
 # Main Function
 # -------------------------------
-def process_video_for_visual_description(video_path, output_dir="frames"):
+def process_video_for_visual_description(video_path, output_dir=None, proxy_path=None, scene_scores_path=None):
     """
-    Main function to process video and return visual descriptions.
+    Main function to process video and return visual descriptions as a SegmentTable.
+    Frames go straight from the decoder to BLIP in memory; output_dir only exports them as JPEGs.
+    When the ingest outputs are given, scenes come from the precomputed scene scores
+    and frames are read from the downscaled proxy instead of decoding the source again.
     """
     # Step 1: Detect scenes
-    timestamps = detect_scenes(video_path, threshold=12.0)
+    with time_stage("scene_detection"):
+        if scene_scores_path and os.path.exists(scene_scores_path):
+            timestamps = detect_scenes_from_scores(scene_scores_path)
+        else:
+            timestamps = detect_scenes(video_path, threshold=12.0)
 
     # Step 2: Extract frames (fallback if scene detection fails)
-    frames = extract_frames(video_path, timestamps, output_dir) if timestamps else fallback_frame_extraction(video_path, output_dir=output_dir)
+    frame_source = proxy_path if proxy_path and os.path.exists(proxy_path) else video_path
+    with time_stage("frame_extraction"):
+        if timestamps:
+            frames = extract_frames(frame_source, timestamps, output_dir)
+        else:
+            frames = adaptive_frame_extraction(frame_source, output_dir=output_dir, scene_scores_path=scene_scores_path)
 
-    # Step 3: Load BLIP model
-    processor, model, device = load_blip_model()
+    # Step 3: Skip near-duplicate frames (they reuse the caption of the frame they match)
+    if FRAME_DEDUPE_ENABLED:
+        with time_stage("frame_dedupe"):
+            unique_frames, sources = dedupe_frames(frames)
+        CAPTION_FRAMES.inc(len(frames) - len(unique_frames), source="dedupe")
+        print(f"[INFO] Frame dedupe: {len(frames) - len(unique_frames)} of {len(frames)} frames reuse an earlier caption")
+    else:
+        unique_frames, sources = frames, list(range(len(frames)))
 
-    # Step 4: Generate raw visual descriptions
-    descriptions = generate_visual_descriptions(processor, model, device, frames)
+    # Step 4: Get the warm BLIP model for the configured backend (loaded once per process)
+    processor, model, device = model_registry.get(blip_model_name())
 
-    # Step 5: Format descriptions as list of strings
-    formatted_descriptions = [f"[{desc['timestamp']:.2f}s] {desc['text']}" for desc in descriptions]
+    # Step 5: Generate raw visual descriptions
+    with time_stage("captioning"):
+        captions = [desc["text"] for desc in generate_visual_descriptions(processor, model, device, unique_frames, cache=caption_cache)]
+    descriptions = [
+        {"timestamp": round(frame["timestamp"], 2), "text": captions[source]} for frame, source in zip(frames, sources)
+    ]
 
-    return formatted_descriptions
+    # Step 6: Collect the captions as a segment table
+    return SegmentTable.from_points([desc["timestamp"] for desc in descriptions], [desc["text"] for desc in descriptions])
 
 
 
@@ -132,6 +511,6 @@ if __name__ == "__main__":
     print(visual_descriptions)
 
     with open("video_descriptions.json", "w") as f:
-        json.dump(visual_descriptions, f, indent=4)
+        json.dump(visual_descriptions.to_records(), f, indent=4)
 
     print(f"Saved {len(visual_descriptions)} descriptions to video_descriptions.json")
@@ -1,52 +1,29 @@
-import re
-
 def extract_timestamps_by_method(method, audio_results, visual_results):
     """
     Extract timestamps based on method type.
 
     Args:
         method (str): 'Learning Method A', 'Learning Method B', or 'Cinematic Method A'
-        audio_results (list): [{'timestamp': '[x.xx - y.yy]', 'text': '...'}]
-        visual_results (list): [{'timestamp': '[x.xx]', 'text': '...'}]
+        audio_results (SegmentTable): selected transcript segments
+        visual_results (SegmentTable): selected captions (start + 1.5s each)
 
     Returns:
         list: [[start, end], ...]
     """
     method = method.strip().lower()
-    timestamps = []
-
-    # Function to extract audio timestamps
-    def get_audio():
-        ts = []
-        for item in audio_results:
-            match = re.findall(r"[\d.]+", item['timestamp'])
-            if len(match) == 2:
-                start, end = map(float, match)
-                ts.append([start, end])
-        return ts
-
-    # Function to extract visual timestamps
-    def get_visual():
-        ts = []
-        for item in visual_results:
-            match = re.findall(r"[\d.]+", item['timestamp'])
-            if len(match) == 1:
-                start = float(match[0])
-                ts.append([start, start + 1.5])
-        return ts
 
     if method == "gemini":
         raise ValueError("Gemini method should be handled separately")
     elif method == "learning_a":
-        timestamps = get_audio()
+        results = audio_results
     elif method in ["learning_b", "cinematic_a"]:
         # Use only visual timestamps like learning_b
-        timestamps = get_visual()
+        results = visual_results
     else:
         raise ValueError(f"Unknown method: {method}")
 
     # Sort timestamps by start time
-    return sorted(timestamps, key=lambda x: x[0])
+    return results.sorted().timestamps()
 
 
 
@@ -54,12 +31,12 @@ audio_data = [{'timestamp': '[238.49s - 241.28s]', 'text': 'Terminator 2 Judgmen
 
 visual_data = [{'timestamp': '[22.57s]', 'text': 'arafed man in a black shirt and black jacket standing in front of a red background'}, {'timestamp': '[137.47s]', 'text': 'arafed man in a black shirt and black jacket standing in front of a red background'}, {'timestamp': '[47.47s]', 'text': 'arafed man in a black shirt and black jacket looking up'}, {'timestamp': '[53.03s]', 'text': 'arafed man in a black shirt and black jacket is making a funny face'}, {'timestamp': '[129.20s]', 'text': 'arafed man in a black shirt and black jacket is making a funny face'}, {'timestamp': '[204.23s]', 'text': 'arafed man in a black suit pointing at something'}, {'timestamp': '[27.90s]', 'text': 'a close up of a man in a suit and tie standing in front of a red background'}, {'timestamp': '[35.17s]', 'text': 'arafed image of a man in a black shirt and a red background'}, {'timestamp': '[43.80s]', 'text': 'arafed image of a man in a black shirt and a red background'}, {'timestamp': '[83.63s]', 'text': 'arafed image of a man in a black shirt and a red background'}, {'timestamp': '[97.33s]', 'text': 'arafed image of a man in a black shirt and a red background'}, {'timestamp': '[40.87s]', 'text': 'a close up of a person with a hand up in front of a picture'}, {'timestamp': '[54.40s]', 'text': 'arafed image of a man with a black shirt and a red background'}, {'timestamp': '[101.20s]', 'text': 'a close up of a person with a video in front of a picture'}, {'timestamp': '[43.17s]', 'text': 'a close up of a man in a suit and sunglasses pointing at a picture'}, {'timestamp': '[44.87s]', 'text': 'arafed image of a man in a suit with a speech bubble above his head'}, {'timestamp': '[256.73s]', 'text': 'terminator 2 judgment day movie poster'}, {'timestamp': '[6.47s]', 'text': 'jeremy jahns presents the best of the best'}, {'timestamp': '[8.47s]', 'text': 'terminator 3 judgment day poster'}]
 # Example 1: Learning Method A → use audio timestamps
-#print(extract_timestamps_by_method("Learning Method A", audio_data, visual_data))
+#print(extract_timestamps_by_method("Learning Method A", SegmentTable.from_records(audio_data), SegmentTable.from_records(visual_data, point=True)))
 # Output: [[11.52, 13.16], [96.68, 97.26], [238.49, 241.28]]
 
 # Example 2: Learning Method B → use visual timestamps
 # Output: [[22.73, 24.23], [61.47, 62.97]]
 
 # Example 3: Cinematic Method A → also use visual timestamps
-#print(extract_timestamps_by_method("Cinematic Method A", audio_data, visual_data))
+#print(extract_timestamps_by_method("Cinematic Method A", SegmentTable.from_records(audio_data), SegmentTable.from_records(visual_data, point=True)))
 # Output: [[22.73, 24.23], [61.47, 62.97]]
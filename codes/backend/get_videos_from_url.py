@@ -1,40 +1,45 @@
 # get_videos_from_url.py
-import boto3
 import os
-import yt_dlp
 import subprocess
-import sys
 import shutil
 from pathlib import Path
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
 # Import centralized configuration
-from config import FFMPEG_PATH, AWS_ACCESS_KEY, AWS_SECRET_KEY, AWS_REGION, BUCKET_NAME, DOWNLOAD_DIR
+from config import FFMPEG_PATH, DOWNLOAD_DIR
+from ingest_video import ingest_video, whisper_audio_path
+from s3_transfer import transfer_manager
+from metrics import time_stage
 
 # Set FFmpeg path
 os.environ['PATH'] = FFMPEG_PATH + os.pathsep + os.environ['PATH']
 
-# Verify ffmpeg exists
-try:
-    subprocess.run(["ffmpeg", "-version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-except Exception as e:
-    print(f"[ERROR] ffmpeg not found or not executable: {e}")
-    sys.exit(1)
-
-# Initialize S3 client
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_KEY,
-    aws_secret_access_key=AWS_SECRET_KEY,
-    region_name=AWS_REGION
-)
+_ffmpeg_checked = False
+
+def check_ffmpeg():
+    """
+    Verify ffmpeg exists (once per process). Raises RuntimeError instead of exiting,
+    so modules that never touch video can still import this one.
+    """
+    global _ffmpeg_checked
+    if _ffmpeg_checked:
+        return
+    try:
+        subprocess.run(["ffmpeg", "-version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except Exception as e:
+        print(f"[ERROR] ffmpeg not found or not executable: {e}")
+        raise RuntimeError(f"ffmpeg not found or not executable: {e}")
+    _ffmpeg_checked = True
 
 def download_youtube_video_and_audio(url: str, download_dir: str = DOWNLOAD_DIR) -> tuple:
     """
-    Download video in 360p and extract optimized audio as WAV for Whisper transcription.
-    Returns a tuple (local_video_path, local_audio_path)
+    Download video in 360p and ingest it in a single decode pass
+    (Whisper WAV, proxy video and scene scores).
+    Returns a tuple (local_video_path, local_audio_path, ingest)
     """
+    import yt_dlp
+
     Path(download_dir).mkdir(parents=True, exist_ok=True)
     print(f"[INFO] Downloading video from YouTube: {url}")
     
@@ -50,45 +55,38 @@ def download_youtube_video_and_audio(url: str, download_dir: str = DOWNLOAD_DIR)
     }
     
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with time_stage("download"), yt_dlp.YoutubeDL(ydl_opts) as ydl:
             info_dict = ydl.extract_info(url, download=True)
             video_filename = ydl.prepare_filename(info_dict)
         
-        # Extract optimized audio for Whisper
+        # Extract optimized audio for Whisper (plus proxy video and scene scores)
         audio_filename = os.path.splitext(video_filename)[0] + "_whisper.wav"
-        ffmpeg_cmd = [
-            "ffmpeg", "-y", "-i", video_filename,
-            "-vn",                 # no video
-            "-acodec", "pcm_s16le", # 16-bit PCM
-            "-ar", "16000",         # 16 kHz sample rate
-            "-ac", "1",             # mono
-            audio_filename
-        ]
-        subprocess.run(ffmpeg_cmd, check=True)
+        ingest = ingest_video(video_filename, audio_filename)
         
         print(f"[INFO] Video downloaded: {video_filename}")
         print(f"[INFO] Audio extracted for Whisper: {audio_filename}")
         
-        return video_filename, audio_filename
+        return video_filename, audio_filename, ingest
     except Exception as e:
         print(f"[ERROR] YouTube download failed: {e}")
         raise
 
 # Rest of the functions remain the same but use config imports
 
-def process_uploaded_video(video_path: str, download_dir: str = "downloads") -> tuple:
+def process_uploaded_video(video_path: str, download_dir: str = None, ingest=None) -> tuple:
     """
-    Process an uploaded video file: copy to download directory and extract audio.
-    Returns a tuple (local_video_path, local_audio_path)
+    Process an uploaded video file and ingest it in a single decode pass
+    (Whisper WAV, proxy video and scene scores).
+    The upload is used in place; it is only copied when a different download_dir is given.
+    ingest is an optional StreamingIngest already started while the file was received.
+    Returns a tuple (local_video_path, local_audio_path, ingest)
     """
-    # Use the provided download_dir (which will be your temp directory)
-    Path(download_dir).mkdir(parents=True, exist_ok=True)
-    
-    # Instead of copying, use the original path if it's already in the right directory
-    if os.path.dirname(video_path) == download_dir:
+    if download_dir is None or os.path.abspath(os.path.dirname(video_path)) == os.path.abspath(download_dir):
         video_filename = video_path  # Already in the right place
+        download_dir = os.path.dirname(video_path)
     else:
         # Copy the uploaded video to the download directory
+        Path(download_dir).mkdir(parents=True, exist_ok=True)
         video_filename = os.path.join(download_dir, os.path.basename(video_path))
         try:
             shutil.copy2(video_path, video_filename)
@@ -98,22 +96,22 @@ def process_uploaded_video(video_path: str, download_dir: str = "downloads") ->
             video_filename = video_path
     
     # Extract optimized audio for Whisper
-    audio_filename = os.path.join(download_dir, os.path.splitext(os.path.basename(video_filename))[0] + "_whisper.wav")
-    
-    ffmpeg_cmd = [
-        "ffmpeg", "-y", "-i", video_filename,  # Use "ffmpeg" instead of FFMPEG_PATH
-        "-vn",                 # no video
-        "-acodec", "pcm_s16le", # 16-bit PCM
-        "-ar", "16000",         # 16 kHz sample rate
-        "-ac", "1",             # mono
-        audio_filename
-    ]
+    audio_filename = whisper_audio_path(video_filename, download_dir)
+
+    if ingest is not None and ingest.video_path == video_filename:
+        try:
+            ingest_result = ingest.result()
+            print(f"[INFO] Audio extracted for Whisper during upload: {ingest_result['audio_path']}")
+            return video_filename, ingest_result["audio_path"], ingest_result
+        except Exception as e:
+            # e.g. a container that could not be decoded from a stream; retry from the file
+            print(f"[ERROR] Streaming ingest failed, ingesting from file: {e}")
     
     try:
-        result = subprocess.run(ffmpeg_cmd, check=True, capture_output=True, text=True)
+        ingest_result = ingest_video(video_filename, audio_filename)
         print(f"[INFO] Video processed: {video_filename}")
         print(f"[INFO] Audio extracted for Whisper: {audio_filename}")
-        return video_filename, audio_filename
+        return video_filename, audio_filename, ingest_result
     except subprocess.CalledProcessError as e:
         print(f"FFmpeg error: {e}")
         print(f"FFmpeg stderr: {e.stderr}")
@@ -125,44 +123,53 @@ def get_timestamp_string():
     return now.strftime("%d%m%Y_%H%M")
 def upload_file_to_s3(local_file_path: str, s3_key: str) -> str:
     """
-    Upload a local file to S3 at the given key.
+    Upload a local file to S3 at the given key and wait for it to finish.
     Returns the S3 object URL (https format).
     """
-    print(f"[INFO] Uploading {local_file_path} to s3://{BUCKET_NAME}/{s3_key}")
-    s3_client.upload_file(local_file_path, BUCKET_NAME, s3_key)
-    
-    # Return object URL instead of S3 URI
-    object_url = f"https://{BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{s3_key}"
-    print(f"[INFO] Upload successful: {object_url}")
-    return object_url
+    return transfer_manager.upload(local_file_path, s3_key).result()
 
 
-def handle_video_input(input_source: str, is_youtube: bool = True):
+def prepare_video_input(input_source: str, is_youtube: bool = True, ingest=None):
     """
-    Handle either YouTube URL or uploaded video file.
-    Download/process video + audio and upload both to S3.
-    Returns a tuple (video_path, audio_path, video_s3_url, audio_s3_url, base_filename)
+    Download/process video + audio locally without uploading anything.
+    ingest is an optional StreamingIngest of an uploaded file (see upload_spool).
+    Returns a tuple (video_path, audio_path, base_filename, ingest)
     """
+    check_ffmpeg()
     if is_youtube:
-        local_video, local_audio = download_youtube_video_and_audio(input_source)
+        local_video, local_audio, ingest = download_youtube_video_and_audio(input_source)
     else:
-        local_video, local_audio = process_uploaded_video(input_source)
+        local_video, local_audio, ingest = process_uploaded_video(input_source, ingest=ingest)
     
     # Get base filename without extension and current timestamp
     base_filename = os.path.splitext(os.path.basename(local_video))[0]
     timestamp_str = get_timestamp_string()
     filename_with_timestamp = f"{base_filename}_{timestamp_str}"
     
-    # Upload video with timestamp
-    video_ext = os.path.splitext(local_video)[1]
-    video_s3_key = f"videos/{filename_with_timestamp}{video_ext}"
-    video_s3_url = upload_file_to_s3(local_video, video_s3_key)
-    
-    # Upload audio with timestamp
-    audio_ext = os.path.splitext(local_audio)[1]
-    audio_s3_key = f"audios/{filename_with_timestamp}_whisper{audio_ext}"
-    audio_s3_url = upload_file_to_s3(local_audio, audio_s3_key)
-    
+    return local_video, local_audio, filename_with_timestamp, ingest
+
+
+def upload_video_inputs(local_video: str, local_audio: str, video_hash: str = None):
+    """
+    Start background uploads of the source video and its Whisper audio.
+    Objects are stored under videos/ and audios/ by content hash, and an upload is
+    skipped when that object already exists.
+    Returns a tuple of futures (video_s3_url, audio_s3_url)
+    """
+    video_future = transfer_manager.upload_deduplicated(local_video, "videos", content_hash=video_hash)
+    audio_future = transfer_manager.upload_deduplicated(local_audio, "audios")
+    return video_future, audio_future
+
+
+def handle_video_input(input_source: str, is_youtube: bool = True):
+    """
+    Handle either YouTube URL or uploaded video file.
+    Download/process video + audio and upload both to S3.
+    Returns a tuple (video_path, audio_path, video_s3_url, audio_s3_url, base_filename)
+    """
+    local_video, local_audio, filename_with_timestamp, _ = prepare_video_input(input_source, is_youtube)
+    video_future, audio_future = upload_video_inputs(local_video, local_audio)
+    video_s3_url, audio_s3_url = video_future.result(), audio_future.result()
     return local_video, local_audio, video_s3_url, audio_s3_url, filename_with_timestamp
 
 # ---------------- Example usage ----------------
@@ -0,0 +1,188 @@
+# ingest_video.py
+import os
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import Future
+
+# Import centralized configuration
+from config import PROXY_HEIGHT, SCENE_SCORE_THRESHOLD
+from metrics import time_stage
+
+
+# -------------------------------
+# Single-decode Ingestion
+# -------------------------------
+def whisper_audio_path(video_path, output_dir=None):
+    """Path of the Whisper WAV for a video (next to it unless output_dir is given)."""
+    output_dir = os.path.dirname(video_path) if output_dir is None else output_dir
+    return os.path.join(output_dir, os.path.splitext(os.path.basename(video_path))[0] + "_whisper.wav")
+
+
+def ingest_outputs(video_path, audio_path):
+    """
+    Output paths of the ingest pass. They sit next to the WAV and are named after the source video.
+    """
+    base = os.path.join(os.path.dirname(audio_path), os.path.splitext(os.path.basename(video_path))[0])
+    return {
+        "audio_path": audio_path,
+        "proxy_path": base + "_proxy.mp4",
+        "scene_scores_path": base + "_scene_scores.txt",
+    }
+
+
+def video_height(video_path):
+    """Frame height of video_path in pixels (0 when it cannot be read)."""
+    # Imported here so the API (which imports this module through upload_spool) boots without OpenCV
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) if cap.isOpened() else 0
+    cap.release()
+    return height
+
+
+def build_ingest_command(input_path, outputs, proxy_height=PROXY_HEIGHT, proxy=True):
+    """
+    ffmpeg command for the single-decode ingest. input_path may be "pipe:0" to read the source from stdin.
+    proxy=False leaves out the proxy video (the source is small enough to extract frames from).
+    """
+    # Escape the scores path for the ffmpeg filter syntax (same as the SRT path in create_final_video_ffmpeg)
+    escaped_scores_path = outputs["scene_scores_path"].replace('\\', '/').replace(':', '\\:')
+    scan = f"select='gte(scene,0)',metadata=print:key=lavfi.scene_score:file='{escaped_scores_path}'[scanned]"
+    if proxy:
+        # Only ever scale down (kept even for libx264)
+        filter_complex = f"[0:v]scale=-2:'trunc(min(ih,{proxy_height})/2)*2',split=2[proxy][scan];[scan]{scan}"
+        proxy_output = [
+            # Proxy stream for frame extraction
+            "-map", "[proxy]", "-an",
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "28",
+            outputs["proxy_path"],
+        ]
+    else:
+        filter_complex = f"[0:v]{scan}"
+        proxy_output = []
+
+    return [
+        "ffmpeg", "-y", "-nostdin", "-i", input_path,
+        "-filter_complex", filter_complex,
+        *proxy_output,
+        # Optimized audio for Whisper
+        "-map", "0:a:0", "-vn",
+        "-acodec", "pcm_s16le", # 16-bit PCM
+        "-ar", "16000",         # 16 kHz sample rate
+        "-ac", "1",             # mono
+        outputs["audio_path"],
+        # Scene scores are written by the metadata filter; the frames themselves are discarded
+        "-map", "[scanned]", "-f", "null", "-"
+    ]
+
+
+def ingest_video(video_path, audio_path, proxy_height=PROXY_HEIGHT):
+    """
+    Decode the source once and, in the same ffmpeg pass, write:
+      - the 16 kHz mono PCM WAV for Whisper (audio_path)
+      - a downscaled, audio-less proxy video used for frame extraction
+        (skipped when the source is no taller than proxy_height; 'proxy_path' is then the source)
+      - per-frame content-difference scores used for scene detection
+    Returns a dict with 'audio_path', 'proxy_path' and 'scene_scores_path'.
+    """
+    outputs = ingest_outputs(video_path, audio_path)
+    proxy = not 0 < video_height(video_path) <= proxy_height
+    if not proxy:
+        outputs["proxy_path"] = video_path
+    with time_stage("audio_extraction"):
+        subprocess.run(build_ingest_command(video_path, outputs, proxy_height, proxy), check=True, capture_output=True, text=True)
+
+    print(f"[INFO] Ingested {video_path} in a single decode pass" + ("" if proxy else " (source used as the proxy)"))
+    return outputs
+
+
+class StreamingIngest:
+    """
+    The same single-decode ingest, with ffmpeg reading the source from stdin while it is
+    still being written (an upload in progress). chunks yields the source bytes in order.
+    Only for containers that decode front to back (see upload_spool.probe_streamable).
+    The source size is not known up front here, so the proxy is always written (never upscaled).
+    """
+
+    def __init__(self, video_path, audio_path, chunks, proxy_height=PROXY_HEIGHT):
+        self.video_path = video_path
+        self.outputs = ingest_outputs(video_path, audio_path)
+        self._future = Future()
+        self._process = None
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._run, args=(chunks, proxy_height), name="ingest", daemon=True)
+        self._thread.start()
+
+    def _run(self, chunks, proxy_height):
+        command = build_ingest_command("pipe:0", self.outputs, proxy_height)
+        try:
+            with time_stage("audio_extraction"), tempfile.TemporaryFile() as stderr:
+                self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr)
+                try:
+                    for chunk in chunks:
+                        if self._cancelled:
+                            break
+                        self._process.stdin.write(chunk)
+                    self._process.stdin.close()
+                except BrokenPipeError:
+                    pass  # ffmpeg exited early; its return code says why
+                returncode = self._process.wait()
+                if self._cancelled:
+                    raise RuntimeError(f"Ingest of {self.video_path} was cancelled")
+                if returncode != 0:
+                    stderr.seek(0)
+                    raise subprocess.CalledProcessError(returncode, command, stderr=stderr.read().decode(errors="replace"))
+            print(f"[INFO] Ingested {self.video_path} while it was being received")
+            self._future.set_result(self.outputs)
+        except Exception as e:
+            self._future.set_exception(e)
+
+    def result(self, timeout=None):
+        """Wait for the ingest and return its outputs (raises if ffmpeg failed)."""
+        return self._future.result(timeout)
+
+    def cancel(self):
+        self._cancelled = True
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+
+
+# -------------------------------
+# Scene Detection from Ingest Scores
+# -------------------------------
+def read_scene_scores(scene_scores_path):
+    """
+    Parse the ffmpeg metadata print output into a list of (pts_time, score) pairs.
+    """
+    scores = []
+    pts_time = None
+    with open(scene_scores_path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("frame:"):
+                pts_time = float(line.rsplit("pts_time:", 1)[1])
+            elif line.startswith("lavfi.scene_score=") and pts_time is not None:
+                scores.append((pts_time, float(line.split("=", 1)[1])))
+    return scores
+
+
+def detect_scenes_from_scores(scene_scores_path, threshold=SCENE_SCORE_THRESHOLD, min_scene_len=15):
+    """
+    Detect scene start timestamps (in seconds) from ingest scene scores.
+    Mirrors PySceneDetect's output: an empty list when there is no cut, otherwise
+    the start of every scene including 0.0. Cuts closer than min_scene_len frames are merged.
+    """
+    scores = read_scene_scores(scene_scores_path)
+    if not scores:
+        return []
+
+    scene_starts = [scores[0][0]]
+    last_cut_frame = 0
+    for frame_num, (pts_time, score) in enumerate(scores):
+        if score >= threshold and frame_num - last_cut_frame >= min_scene_len:
+            scene_starts.append(pts_time)
+            last_cut_frame = frame_num
+
+    return scene_starts if len(scene_starts) > 1 else []
@@ -0,0 +1,236 @@
+# job_queue.py
+import json
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# Import centralized configuration
+from config import JOB_QUEUE_BACKEND, JOB_QUEUE_DB_PATH, JOB_WORKERS, JOB_MAX_PENDING, JOB_RESULT_TTL_SECONDS, JOB_MAX_FINISHED
+from metrics import metrics
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+JOB_SECONDS = metrics.histogram(
+    "teaser_job_seconds",
+    "End-to-end run time of teaser jobs in seconds, by final status.",
+    ["status"]
+)
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds JOB_MAX_PENDING unfinished jobs."""
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+# -------------------------------
+# Job Stores
+# -------------------------------
+class InMemoryJobStore:
+    """
+    Keeps job records in a dict. Jobs are lost when the process exits.
+    Finished jobs (and their results) are dropped after ttl_seconds, and the oldest
+    ones as soon as more than max_finished are kept, so a long-running API stays bounded.
+    """
+
+    def __init__(self, ttl_seconds=JOB_RESULT_TTL_SECONDS, max_finished=JOB_MAX_FINISHED):
+        self.ttl_seconds = ttl_seconds
+        self.max_finished = max_finished
+        self._jobs = {}
+        self._finished = OrderedDict()  # job_id -> time.monotonic() it finished, oldest first
+        self._lock = threading.Lock()
+
+    def _evict_finished(self):
+        expired_before = time.monotonic() - self.ttl_seconds
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if finished_at >= expired_before and len(self._finished) <= self.max_finished:
+                break
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
+
+    def create(self, job_id, owner, params):
+        now = _now()
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "owner": owner,
+                "status": JOB_QUEUED,
+                "params": params,
+                "result": None,
+                "error": None,
+                "created_at": now,
+                "updated_at": now,
+            }
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields, updated_at=_now())
+                if fields.get("status") in (JOB_SUCCEEDED, JOB_FAILED):
+                    self._finished[job_id] = time.monotonic()
+            self._evict_finished()
+
+    def get(self, job_id):
+        with self._lock:
+            self._evict_finished()
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def count(self, *statuses):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["status"] in statuses)
+
+
+class SQLiteJobStore:
+    """
+    Keeps job records in a SQLite file so job status survives a restart.
+    Jobs left queued/running by a previous process are marked as failed on startup.
+    """
+
+    def __init__(self, db_path=JOB_QUEUE_DB_PATH):
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    owner TEXT,
+                    status TEXT NOT NULL,
+                    params TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE status IN (?, ?)",
+                (JOB_FAILED, "Interrupted by server restart", _now(), JOB_QUEUED, JOB_RUNNING),
+            )
+
+    def create(self, job_id, owner, params):
+        now = _now()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, owner, status, params, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, owner, JOB_QUEUED, json.dumps(params), now, now),
+            )
+
+    def update(self, job_id, **fields):
+        fields["updated_at"] = _now()
+        for key in ("params", "result"):
+            if key in fields:
+                fields[key] = json.dumps(fields[key])
+        columns = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"]) if job["params"] else None
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def count(self, *statuses):
+        placeholders = ", ".join("?" for _ in statuses)
+        with self._lock:
+            row = self._conn.execute(f"SELECT COUNT(*) FROM jobs WHERE status IN ({placeholders})", statuses).fetchone()
+        return row[0]
+
+
+def create_job_store(backend=JOB_QUEUE_BACKEND):
+    """
+    Build the job store selected by JOB_QUEUE_BACKEND ("memory" or "sqlite").
+    """
+    if backend == "memory":
+        return InMemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore()
+    raise ValueError(f"Unknown job queue backend: {backend}")
+
+
+# -------------------------------
+# Job Queue
+# -------------------------------
+class JobQueue:
+    """
+    Runs submitted jobs on a bounded worker pool and records their status in a job store.
+    """
+
+    def __init__(self, store=None, max_workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING):
+        self.store = store or create_job_store()
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="teaser-job")
+        self._futures = {}
+        self._submit_lock = threading.Lock()
+
+    def submit(self, fn, owner=None, params=None, **kwargs):
+        """
+        Queue fn(**kwargs) and return the new job id immediately.
+        Raises QueueFullError when too many jobs are already waiting or running.
+        """
+        with self._submit_lock:
+            if self.pending_count() >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({self.max_pending} pending jobs)")
+
+            # Forget futures of finished jobs; their outcome lives in the store
+            self._futures = {jid: f for jid, f in self._futures.items() if not f.done()}
+
+            job_id = str(uuid.uuid4())
+            self.store.create(job_id, owner, params or {})
+            self._futures[job_id] = self._executor.submit(self._run, job_id, fn, kwargs)
+
+        print(f"[INFO] Queued job {job_id}")
+        return job_id
+
+    def _run(self, job_id, fn, kwargs):
+        self.store.update(job_id, status=JOB_RUNNING)
+        print(f"[INFO] Running job {job_id}")
+        start = time.perf_counter()
+        try:
+            result = fn(**kwargs)
+        except Exception as e:
+            print(f"[ERROR] Job {job_id} failed: {e}")
+            traceback.print_exc()
+            self.store.update(job_id, status=JOB_FAILED, error=str(e))
+            JOB_SECONDS.observe(time.perf_counter() - start, status=JOB_FAILED)
+            raise
+        else:
+            self.store.update(job_id, status=JOB_SUCCEEDED, result=result)
+            JOB_SECONDS.observe(time.perf_counter() - start, status=JOB_SUCCEEDED)
+            print(f"[INFO] Job {job_id} finished")
+            return result
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def future(self, job_id):
+        """
+        Return the concurrent.futures.Future of a job still owned by this process, or None.
+        """
+        return self._futures.get(job_id)
+
+    def pending_count(self):
+        return self.store.count(JOB_QUEUED, JOB_RUNNING)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
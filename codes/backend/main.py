@@ -5,15 +5,20 @@ from pathlib import Path
 from datetime import datetime
 
 # Import centralized configuration
-from config import OUTPUT_DIR, FRAMES_DIR
+from config import OUTPUT_DIR, FRAMES_DIR, SAVE_FRAMES, INDEXES_DIR, SAVE_INDEXES, FRAME_DEDUPE_ENABLED, FRAME_DEDUPE_MAX_DISTANCE, WHISPER_MODEL, BLIP_MODEL, BLIP_BACKEND, SCENE_SCORE_THRESHOLD, PROXY_HEIGHT, PRELOAD_MODELS, TRANSCRIBE_MODE, TRANSCRIBE_BACKEND, FASTER_WHISPER_COMPUTE_TYPE, TRANSCRIBE_WINDOW_SECONDS, TRANSCRIBE_OVERLAP_SECONDS, TRANSCRIBE_LANGUAGE, VAD_ENABLED, VAD_MARGIN_DB, VAD_MIN_SILENCE_SECONDS, SCENE_DETECTION_MODE, SCENE_DETECTION_STRIDE, SCENE_DETECTION_HEIGHT, FALLBACK_FRAME_BUDGET, TRANSCRIPT_FILLERS, CAPTION_PREFIXES
+from artifact_cache import artifact_cache, file_content_hash
+from pipeline_dag import PipelineDAG
+from segments import SegmentTable
+from metrics import time_stage
+from model_registry import model_registry
 
 # Import your custom modules
-from get_videos_from_url import handle_video_input, upload_file_to_s3
-from transcribe_audio_from_whisper import transcribe_audio
+from get_videos_from_url import check_ffmpeg, prepare_video_input, upload_video_inputs, upload_file_to_s3
+from transcribe_audio_from_whisper import stream_transcription
 from get_description_from_blip import process_video_for_visual_description
-from clean_audio_transcripts import preprocess_audio
+from clean_audio_transcripts import preprocess_audio_batches
 from clean_visual_descriptions import preprocess_visual
-from create_embeddings_and_query import teaser_pipeline
+from create_embeddings_and_query import IncrementalIndex, teaser_pipeline
 from get_timestamps_from_embeds_output import extract_timestamps_by_method
 # Updated import to include new functions
 from ollama_summarization_voiceover import (
@@ -26,16 +31,26 @@ from ollama_summarization_voiceover import (
 from making_teaser_from_timestamps import crop_and_merge_clips_ffmpeg
 from gemini_for_timestamps import generate_timestamps_with_gemini
 
-def process_video_to_teaser(input_source, max_length=70, min_length=60, is_youtube=True, method="learning_b", output_dir=OUTPUT_DIR):
+def warm_up(models=PRELOAD_MODELS):
     """
-    Main workflow to generate a teaser from either YouTube URL or uploaded video
+    Pay the one-time costs before the first job instead of during it: importing this module
+    loads the stage modules, then ffmpeg is checked and the given models are loaded.
+    """
+    check_ffmpeg()
+    model_registry.preload(models)
+
+def process_video_to_teaser(input_source, max_length=70, min_length=60, is_youtube=True, method="learning_b", output_dir=OUTPUT_DIR, content_hash=None, ingest=None):
+    """
+    Main workflow to generate a teaser from either YouTube URL or uploaded video.
+    Independent stages (transcription vs. visual analysis, S3 uploads vs. everything
+    else) run concurrently as a stage DAG; the result includes per-stage timings.
+    For uploads spooled by upload_spool, content_hash and the already running ingest
+    are passed in so the file is neither re-read for hashing nor decoded twice.
     """
     Path(output_dir).mkdir(exist_ok=True)
 
     print("Step 1: Processing video input...")
-    video_path, audio_path, video_s3_url, audio_s3_url, base_filename = handle_video_input(
-        input_source, is_youtube=is_youtube
-    )
+    video_path, audio_path, base_filename, ingest = prepare_video_input(input_source, is_youtube=is_youtube, ingest=ingest)
 
     audio_path = str(Path(audio_path).resolve())
     video_path = str(Path(video_path).resolve())
@@ -49,124 +64,218 @@ def process_video_to_teaser(input_source, max_length=70, min_length=60, is_youtu
     if not os.path.exists(audio_path):
         raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
+    # The content hash keys the stage cache (re-runs with a different method or
+    # length only pay for selection and rendering) and deduplicates S3 uploads
+    video_hash = content_hash or file_content_hash(video_path)
+
+    # Source uploads only feed the final response, so they run in the background
+    video_upload, audio_upload = upload_video_inputs(video_path, audio_path, video_hash)
+
+    dag = PipelineDAG(max_workers=4)
+
     if method == "gemini":
-        print("Step 2: Generating timestamps with Gemini...")
-        timestamps, total_duration = generate_timestamps_with_gemini(video_path, max_length, min_length)
-        with open(os.path.join(output_dir, "timestamps.json"), "w") as f:
-            json.dump(timestamps, f, indent=2)
-
-        print(f"Total teaser duration: {total_duration:.2f} seconds")
-        print("Step 8: Creating final teaser...")
-        teaser_output = os.path.join(output_dir, "teaser_output.mp4")
-
-        local_teaser_path = crop_and_merge_clips_ffmpeg(
-            video_path=video_path,
-            timestamps=timestamps,
-            output_path=teaser_output,
-            method=method,
-            external_audio_path=None
-        )
+        def gemini_selection():
+            with time_stage("llm_timestamps"):
+                return generate_timestamps_with_gemini(video_path, max_length, min_length)
 
-    else:
-        print("Step 2: Transcribing audio...")
-        raw_audio_transcripts = transcribe_audio(audio_path)
-
-        print("Step 3: Generating visual descriptions...")
-        raw_visual_descriptions = process_video_for_visual_description(video_path, output_dir=FRAMES_DIR)
-
-        print("Step 4: Cleaning transcripts and descriptions...")
-        cleaned_audio = preprocess_audio(raw_audio_transcripts)
-        cleaned_visual = preprocess_visual(raw_visual_descriptions)
-
-        with open(os.path.join(output_dir, "cleaned_audio.json"), "w") as f:
-            json.dump(cleaned_audio, f, indent=2)
-        with open(os.path.join(output_dir, "cleaned_visual.json"), "w") as f:
-            json.dump(cleaned_visual, f, indent=2)
-
-        print("Step 5: Creating embeddings and querying for best segments...")
-        if method == "learning_a":
-            audio_query = "Extract the most impactful and meaningful speech segments from the audio transcript that can create a strong teaser. Prioritize moments of high engagement, including welcoming introductions and send-off or closing remarks."
-            visual_query = ""
-        elif method == "learning_b":
-            audio_query = "key points and summary"
-            visual_query = "Identify the most visually striking and dramatic scenes suitable for a teaser. Focus on visually engaging and attention-grabbing moments that are cinematic and memorable."
-        elif method == "cinematic_a":
-            audio_query = "Key points and summary for teaser."
-            visual_query = "Identify the most visually striking and dramatic scenes suitable for a teaser. Focus on visually engaging and attention-grabbing moments that are cinematic and memorable."
-
-        audio_results, visual_results, total_duration = teaser_pipeline(
-            method,
-            max_length=max_length,
-            min_length=min_length,
-            audio_data=cleaned_audio,
-            visual_data=cleaned_visual,
-            query_audio_text=audio_query,
-            query_visual_text=visual_query
-        )
-
-        print("Step 6: Extracting timestamps...")
-        timestamps = extract_timestamps_by_method(method, audio_results, visual_results)
-
-        with open(os.path.join(output_dir, "timestamps.json"), "w") as f:
-            json.dump(timestamps, f, indent=2)
-
-        print(f"Total teaser duration: {total_duration:.2f} seconds")
-
-        voiceover_path = None
-        summary_text = None
-        srt_path = None
-        if method in ["learning_b", "cinematic_a"]:
-            print("Step 7: Generating voiceover summary...")
-            full_transcript = " ".join([item['text'] for item in cleaned_audio])
-
-            summary_text = summarize_text(
-                transcript=full_transcript,
-                duration_seconds=total_duration,
-                wpm=140
+        def gemini_timestamps():
+            print("Step 2: Generating timestamps with Gemini...")
+            timestamps, total_duration = artifact_cache.get_or_compute_json(
+                video_hash, "gemini_timestamps",
+                lambda: list(gemini_selection()),
+                max_length=max_length, min_length=min_length
             )
+            with open(os.path.join(output_dir, "timestamps.json"), "w") as f:
+                json.dump(timestamps, f, indent=2)
 
-            if summary_text:
-                voiceover_path = os.path.join(output_dir, "voiceover.mp3")
-                create_timed_audio(
-                    text=summary_text,
-                    duration_seconds=total_duration,
-                    filename=voiceover_path
-                )
+            print(f"Total teaser duration: {total_duration:.2f} seconds")
+            return {"timestamps": timestamps, "total_duration": total_duration, "summary_text": None}
 
-                # Generate sentence-level transcript and subtitles
-                print("Step 7.1: Creating subtitle file...")
-                sentence_transcript = create_sentence_transcript(summary_text, total_duration)
-                srt_path = os.path.join(output_dir, "voiceover_subtitles.srt")
-                generate_srt_file(sentence_transcript, srt_path)
-            else:
-                print("Warning: Voiceover generation failed, proceeding without voiceover")
+        def render(selection):
+            print("Step 8: Creating final teaser...")
+            teaser_output = os.path.join(output_dir, "teaser_output.mp4")
 
-        print("Step 8: Creating final teaser...")
-        teaser_output = os.path.join(output_dir, "teaser_output.mp4")
-
-        # If voiceover exists, merge with video + subtitles using FFmpeg
-        if voiceover_path and srt_path and os.path.exists(voiceover_path) and os.path.exists(srt_path):
-            try:
-                create_final_video_ffmpeg(
+            with time_stage("render"):
+                return crop_and_merge_clips_ffmpeg(
                     video_path=video_path,
-                    audio_path=voiceover_path,
-                    srt_path=srt_path,
-                    output_path=teaser_output
-                )
-                local_teaser_path = teaser_output
-            except Exception as e:
-                print(f"Error creating final video with FFmpeg: {e}")
-                print("Falling back to basic clip merging...")
-                local_teaser_path = crop_and_merge_clips_ffmpeg(
-                    video_path=video_path,
-                    timestamps=timestamps,
+                    timestamps=selection["timestamps"],
                     output_path=teaser_output,
                     method=method,
-                    external_audio_path=voiceover_path
+                    external_audio_path=None
+                )
+
+        dag.add("selection", gemini_timestamps)
+        dag.add("render", render, deps=["selection"])
+
+    else:
+        # Filled while the transcript streams in, so selection does not re-embed the audio
+        audio_index = IncrementalIndex()
+
+        def transcription():
+            print("Step 2: Transcribing audio...")
+            transcript_params = {"model": WHISPER_MODEL, "mode": TRANSCRIBE_MODE, "backend": TRANSCRIBE_BACKEND}
+            if TRANSCRIBE_BACKEND == "faster_whisper":
+                # int8 and float16/float32 weights transcribe differently
+                transcript_params["compute_type"] = FASTER_WHISPER_COMPUTE_TYPE
+            if TRANSCRIBE_MODE == "chunked":
+                # VAD and windowing change what Whisper hears
+                transcript_params.update(
+                    vad=[VAD_MARGIN_DB, VAD_MIN_SILENCE_SECONDS] if VAD_ENABLED else None,
+                    window=TRANSCRIBE_WINDOW_SECONDS, overlap=TRANSCRIBE_OVERLAP_SECONDS, language=TRANSCRIBE_LANGUAGE
                 )
-        else:
-            # No voiceover, fallback to teaser clip merge
-            local_teaser_path = crop_and_merge_clips_ffmpeg(
+            # The cleaned transcript also depends on the filler list it was cleaned with
+            cleaned_transcript_params = {"fillers": ",".join(TRANSCRIPT_FILLERS)}
+            cached_cleaned = artifact_cache.get_json(video_hash, "cleaned_transcript", **transcript_params, **cleaned_transcript_params)
+            if cached_cleaned is not None:
+                print("[INFO] Using cached cleaned_transcript")
+                cleaned_audio = SegmentTable.from_json(cached_cleaned)
+            else:
+                cached_raw = artifact_cache.get_json(video_hash, "transcript", **transcript_params)
+                raw_batches = [SegmentTable.from_json(cached_raw)] if cached_raw is not None else stream_transcription(audio_path)
+                raw_audio_transcripts = []
+
+                def collect(batches):
+                    for batch in batches:
+                        raw_audio_transcripts.append(batch)
+                        yield batch
+
+                # Each transcribed window is cleaned and embedded while the next ones are transcribed
+                print("Step 4: Cleaning and embedding transcripts as they arrive...")
+                cleaned_batches = []
+                for cleaned_batch in preprocess_audio_batches(collect(raw_batches)):
+                    cleaned_batches.append(cleaned_batch)
+                    audio_index.add(cleaned_batch)
+                cleaned_audio = SegmentTable.concat(cleaned_batches)
+
+                artifact_cache.put_json(video_hash, "transcript", SegmentTable.concat(raw_audio_transcripts).to_json(), **transcript_params)
+                artifact_cache.put_json(video_hash, "cleaned_transcript", cleaned_audio.to_json(), **transcript_params, **cleaned_transcript_params)
+
+            with open(os.path.join(output_dir, "cleaned_audio.json"), "w") as f:
+                json.dump(cleaned_audio.to_records(), f, indent=2)
+            return cleaned_audio
+
+        def visual_description():
+            print("Step 3: Generating visual descriptions...")
+            # Everything that changes the raw captions; the cleaned captions are keyed by it too
+            caption_params = {
+                "model": BLIP_MODEL, "backend": BLIP_BACKEND, "scene_threshold": SCENE_SCORE_THRESHOLD,
+                "proxy_height": PROXY_HEIGHT,  # scene scores and frames come from the proxy
+                "frame_dedupe": FRAME_DEDUPE_MAX_DISTANCE if FRAME_DEDUPE_ENABLED else None,
+                # Which frames get captioned
+                "scene_detection": [SCENE_DETECTION_MODE, SCENE_DETECTION_STRIDE, SCENE_DETECTION_HEIGHT],
+                "fallback_budget": FALLBACK_FRAME_BUDGET
+            }
+            raw_visual_descriptions = SegmentTable.from_json(artifact_cache.get_or_compute_json(
+                video_hash, "captions",
+                lambda: process_video_for_visual_description(
+                    video_path,
+                    output_dir=os.path.join(FRAMES_DIR, video_hash) if SAVE_FRAMES else None,
+                    proxy_path=ingest["proxy_path"],
+                    scene_scores_path=ingest["scene_scores_path"]
+                ).to_json(),
+                **caption_params
+            ))
+
+            print("Step 4: Cleaning visual descriptions...")
+            cleaned_visual = SegmentTable.from_json(artifact_cache.get_or_compute_json(
+                video_hash, "cleaned_captions", lambda: preprocess_visual(raw_visual_descriptions).to_json(), **caption_params,
+                prefixes=",".join(CAPTION_PREFIXES)
+            ))
+            with open(os.path.join(output_dir, "cleaned_visual.json"), "w") as f:
+                json.dump(cleaned_visual.to_records(), f, indent=2)
+            return cleaned_visual
+
+        def selection(transcription, visual_description):
+            print("Step 5: Creating embeddings and querying for best segments...")
+            if method == "learning_a":
+                audio_query = "Extract the most impactful and meaningful speech segments from the audio transcript that can create a strong teaser. Prioritize moments of high engagement, including welcoming introductions and send-off or closing remarks."
+                visual_query = ""
+            elif method == "learning_b":
+                audio_query = "key points and summary"
+                visual_query = "Identify the most visually striking and dramatic scenes suitable for a teaser. Focus on visually engaging and attention-grabbing moments that are cinematic and memorable."
+            elif method == "cinematic_a":
+                audio_query = "Key points and summary for teaser."
+                visual_query = "Identify the most visually striking and dramatic scenes suitable for a teaser. Focus on visually engaging and attention-grabbing moments that are cinematic and memorable."
+
+            audio_results, visual_results, total_duration = teaser_pipeline(
+                method,
+                max_length=max_length,
+                min_length=min_length,
+                audio_data=transcription,
+                visual_data=visual_description,
+                query_audio_text=audio_query,
+                query_visual_text=visual_query,
+                content_hash=video_hash,
+                prebuilt_audio_index=audio_index,
+                index_dir=os.path.join(INDEXES_DIR, video_hash, method) if SAVE_INDEXES else None
+            )
+
+            print("Step 6: Extracting timestamps...")
+            timestamps = extract_timestamps_by_method(method, audio_results, visual_results)
+
+            with open(os.path.join(output_dir, "timestamps.json"), "w") as f:
+                json.dump(timestamps, f, indent=2)
+
+            print(f"Total teaser duration: {total_duration:.2f} seconds")
+            return {"timestamps": timestamps, "total_duration": total_duration}
+
+        def voiceover(transcription, selection):
+            voiceover_path = None
+            summary_text = None
+            srt_path = None
+            if method in ["learning_b", "cinematic_a"]:
+                print("Step 7: Generating voiceover summary...")
+                total_duration = selection["total_duration"]
+                full_transcript = " ".join(transcription.text)
+
+                with time_stage("llm_summary"):
+                    summary_text = summarize_text(
+                        transcript=full_transcript,
+                        duration_seconds=total_duration,
+                        wpm=140
+                    )
+
+                if summary_text:
+                    voiceover_path = os.path.join(output_dir, "voiceover.mp3")
+                    with time_stage("tts"):
+                        create_timed_audio(
+                            text=summary_text,
+                            duration_seconds=total_duration,
+                            filename=voiceover_path
+                        )
+
+                    # Generate sentence-level transcript and subtitles
+                    print("Step 7.1: Creating subtitle file...")
+                    sentence_transcript = create_sentence_transcript(summary_text, total_duration)
+                    srt_path = os.path.join(output_dir, "voiceover_subtitles.srt")
+                    generate_srt_file(sentence_transcript, srt_path)
+                else:
+                    print("Warning: Voiceover generation failed, proceeding without voiceover")
+
+            return {"voiceover_path": voiceover_path, "srt_path": srt_path, "summary_text": summary_text}
+
+        def render_teaser(selection, voiceover):
+            teaser_output = os.path.join(output_dir, "teaser_output.mp4")
+            timestamps = selection["timestamps"]
+            voiceover_path = voiceover["voiceover_path"]
+            srt_path = voiceover["srt_path"]
+
+            # If voiceover exists, merge with video + subtitles using FFmpeg
+            if voiceover_path and srt_path and os.path.exists(voiceover_path) and os.path.exists(srt_path):
+                try:
+                    create_final_video_ffmpeg(
+                        video_path=video_path,
+                        audio_path=voiceover_path,
+                        srt_path=srt_path,
+                        output_path=teaser_output
+                    )
+                    return teaser_output
+                except Exception as e:
+                    print(f"Error creating final video with FFmpeg: {e}")
+                    print("Falling back to basic clip merging...")
+
+            # No voiceover (or FFmpeg merge failed), fallback to teaser clip merge
+            return crop_and_merge_clips_ffmpeg(
                 video_path=video_path,
                 timestamps=timestamps,
                 output_path=teaser_output,
@@ -174,21 +283,51 @@ def process_video_to_teaser(input_source, max_length=70, min_length=60, is_youtu
                 external_audio_path=voiceover_path
             )
 
-    print("Step 9: Uploading final teaser to S3...")
-    teaser_s3_key = f"teasers/{base_filename}_teaser.mp4"
-    teaser_s3_url = upload_file_to_s3(local_teaser_path, teaser_s3_key)
+        def render(selection, voiceover):
+            print("Step 8: Creating final teaser...")
+            with time_stage("render"):
+                return render_teaser(selection, voiceover)
+
+        # Transcription and visual description do not depend on each other
+        dag.add("transcription", transcription)
+        dag.add("visual_description", visual_description)
+        dag.add("selection", selection, deps=["transcription", "visual_description"])
+        dag.add("voiceover", voiceover, deps=["transcription", "selection"])
+        dag.add("render", render, deps=["selection", "voiceover"])
+
+    def upload_teaser(render):
+        print("Step 9: Uploading final teaser to S3...")
+        teaser_s3_key = f"teasers/{base_filename}_teaser.mp4"
+        return upload_file_to_s3(render, teaser_s3_key)
+
+    dag.add("upload_teaser", upload_teaser, deps=["render"])
+
+    try:
+        results = dag.run()
+    finally:
+        # The uploads read files in the job workspace, which the caller deletes once this returns.
+        # Wait rather than cancel: a deduplicated upload may be shared with another job.
+        for upload in (video_upload, audio_upload):
+            if upload.exception() is not None:
+                print(f"[ERROR] Source upload failed: {upload.exception()}")
+    video_s3_url, audio_s3_url = video_upload.result(), audio_upload.result()
+    teaser_s3_url = results["upload_teaser"]
+    selection = results["selection"]
+    summary_text = results["voiceover"]["summary_text"] if "voiceover" in results else None
 
     print(f"Teaser generation complete! Download at: {teaser_s3_url}")
+    print(f"Critical path: {' -> '.join(dag.timings['critical_path'])} ({dag.timings['critical_path_seconds']:.2f}s of {dag.timings['wall_seconds']:.2f}s)")
 
     return {
         "s3_url": teaser_s3_url,
-        "local_path": local_teaser_path,
-        "timestamps": timestamps,
-        "duration": total_duration,
+        "local_path": results["render"],
+        "timestamps": selection["timestamps"],
+        "duration": selection["total_duration"],
         "video_s3_url": video_s3_url,
         "audio_s3_url": audio_s3_url,
         "summary": summary_text if method == "learning_b" else None,
         "method": method,
+        "timings": dag.timings,
         "status": "success"
     }
 
@@ -1,8 +1,10 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request, Response, Depends
+from fastapi import FastAPI, HTTPException, Request, Response, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
 import os
+import sys
 import tempfile
 import shutil
 from pathlib import Path
@@ -11,21 +13,30 @@ from pydantic import BaseModel, EmailStr
 import bcrypt
 import uuid
 import json
+import asyncio
+import threading
 from datetime import datetime, timedelta
 from db import users_collection, user_history_collection
 from db_helper import save_teaser_history
-from config import FFMPEG_PATH
+from config import FFMPEG_PATH, PRELOAD_MODELS, WARM_UP_ON_STARTUP
+from model_registry import model_registry
+from job_queue import JobQueue, QueueFullError, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED
+from metrics import metrics
+from upload_spool import MultipartSpooler
 import re
 
-# Import your existing function
-from main import process_video_to_teaser
-
 # Set FFmpeg path for the entire application
 os.environ['PATH'] = FFMPEG_PATH + os.pathsep + os.environ['PATH']
 
 # Session storage (in production, use Redis or database)
 sessions = {}
 
+# Teaser jobs run on a bounded worker pool so the event loop stays responsive
+job_queue = JobQueue()
+
+metrics.gauge("teaser_jobs_queued", "Teaser jobs waiting for a worker.", fn=lambda: job_queue.store.count(JOB_QUEUED))
+metrics.gauge("teaser_jobs_in_flight", "Teaser jobs currently running.", fn=lambda: job_queue.store.count(JOB_RUNNING))
+
 # Security
 security = HTTPBearer()
 
@@ -159,10 +170,42 @@ def safe_cleanup_directory(directory_path: str):
     except Exception as e:
         print(f"Warning: Error during cleanup: {e}")
 
+def warm_up_pipeline():
+    """
+    Import the pipeline (and its ML stack) and load PRELOAD_MODELS, so the first job skips those costs.
+    """
+    try:
+        from main import warm_up
+        warm_up(PRELOAD_MODELS)
+        print("[INFO] Pipeline warm-up complete")
+    except Exception as e:
+        print(f"[ERROR] Pipeline warm-up failed: {e}")
+
+@app.on_event("startup")
+def start_warm_up():
+    # The pipeline is imported on the first job; warming up runs in the background
+    # so the API (auth, history, job status) is ready immediately
+    if WARM_UP_ON_STARTUP or PRELOAD_MODELS:
+        threading.Thread(target=warm_up_pipeline, name="warm-up", daemon=True).start()
+
+@app.on_event("shutdown")
+def shutdown_job_queue():
+    job_queue.shutdown(wait=False)
+    # Whisper worker processes exist only if a chunked transcription ran
+    if "transcription_engine" in sys.modules:
+        sys.modules["transcription_engine"].shutdown_transcription_pool()
+
 @app.get("/health")
 async def health_check():
     print("Health check endpoint called")
-    return {"status": "healthy"}
+    return {"status": "healthy", "pipeline_loaded": "main" in sys.modules, "models_loaded": list(model_registry.loaded())}
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Pipeline stage latencies, job timings and queue gauges in Prometheus text format
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.post("/signup")
 async def signup(user: UserSignup):
@@ -238,95 +281,30 @@ async def get_history(current_user: SessionData = Depends(get_current_user)):
     # Return the teasers array
     return history_doc.get("teasers", [])
 
-@app.post("/generate-teaser")
-async def generate_teaser(
-    request: Request,
-    method: str = Form(...),
-    max_length: int = Form(70),
-    min_length: int = Form(60),
-    youtube_url: Optional[str] = Form(None),
-    video_file: Optional[UploadFile] = File(None),
-    current_user: SessionData = Depends(get_current_user)
-):
+def run_teaser_job(user_email, temp_dir, input_source, is_youtube, method, max_length, min_length, youtube_url=None, content_hash=None, ingest=None):
     """
-    Generate a teaser video from either YouTube URL or uploaded file
+    Worker-side body of a teaser job: run the pipeline, save history and clean up the job workspace.
     """
-    if not youtube_url and not video_file:
-        raise HTTPException(status_code=400, detail="Either YouTube URL or video file must be provided")
-    if youtube_url and video_file:
-        raise HTTPException(status_code=400, detail="Provide either YouTube URL or video file, not both")
-    
-    valid_methods = ["learning_a", "learning_b", "cinematic_a", "gemini"]
-    if method not in valid_methods:
-        raise HTTPException(status_code=400, detail=f"Method must be one of: {', '.join(valid_methods)}")
-
-    # Create temporary directory with proper permissions
-    temp_dir = create_temp_directory()
-    
     try:
-        if youtube_url:
-            print(f"Processing YouTube URL: {youtube_url}")
-            # Process YouTube URL
-            result = process_video_to_teaser(
-                input_source=youtube_url,
-                max_length=max_length,
-                min_length=min_length,
-                is_youtube=True,
-                method=method,
-                output_dir=temp_dir
-            )
-        else:
-            print(f"Processing uploaded file: {video_file.filename}")
-            
-            # Sanitize filename for Windows and create safe path
-            safe_filename = re.sub(r'[\\/*?:"<>|]', "_", video_file.filename)
-            # Add timestamp to make filename unique
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            name, ext = os.path.splitext(safe_filename)
-            unique_filename = f"{name}_{timestamp}{ext}"
-            
-            file_path = os.path.join(temp_dir, unique_filename)
-            
-            print(f"Saving file to: {file_path}")
-            
-            # Save uploaded file with better error handling
-            try:
-                with open(file_path, "wb") as buffer:
-                    # Read file in chunks to avoid memory issues
-                    while chunk := await video_file.read(8192):  # 8KB chunks
-                        buffer.write(chunk)
-                print(f"File saved successfully: {file_path}")
-            except Exception as file_error:
-                print(f"Error saving file: {file_error}")
-                raise HTTPException(
-                    status_code=500, 
-                    detail=f"Failed to save uploaded file: {str(file_error)}"
-                )
-
-            # Verify file was saved
-            if not os.path.exists(file_path):
-                raise HTTPException(
-                    status_code=500, 
-                    detail="File was not saved properly"
-                )
-            
-            print(f"File size: {os.path.getsize(file_path)} bytes")
-
-            # Process uploaded file
-            result = process_video_to_teaser(
-                input_source=file_path,
-                max_length=max_length,
-                min_length=min_length,
-                is_youtube=False,
-                method=method,
-                output_dir=temp_dir
-            )
+        # Imported on first use so API startup does not load the ML stack
+        from main import process_video_to_teaser
+
+        result = process_video_to_teaser(
+            input_source=input_source,
+            max_length=max_length,
+            min_length=min_length,
+            is_youtube=is_youtube,
+            method=method,
+            output_dir=temp_dir,
+            content_hash=content_hash,
+            ingest=ingest
+        )
 
         # Save teaser history
         save_teaser_history(
-            user_email=current_user.email,
+            user_email=user_email,
             method=method,
-            youtube_url=youtube_url if youtube_url else None,
+            youtube_url=youtube_url,
             main_file_url=result.get("video_s3_url"),
             teaser_file_url=result.get("s3_url"),
             duration=result.get("duration"),
@@ -336,11 +314,155 @@ async def generate_teaser(
             }
         )
 
-        return JSONResponse(content=result)
+        return result
+    finally:
+        # Clean up temporary directory
+        safe_cleanup_directory(temp_dir)
+
+async def receive_teaser_form(request: Request, temp_dir: str):
+    """
+    Stream the multipart form straight into the job workspace.
+    The uploaded file is hashed while it arrives, and streamable containers start
+    ingesting before the upload finishes. Returns (fields, upload spool or None).
+    """
+    def upload_path_for(filename):
+        print(f"Processing uploaded file: {filename}")
+        # Sanitize filename for Windows and create safe path
+        safe_filename = re.sub(r'[\\/*?:"<>|]', "_", os.path.basename(filename))
+        # Add timestamp to make filename unique
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        name, ext = os.path.splitext(safe_filename)
+        file_path = os.path.join(temp_dir, f"{name}_{timestamp}{ext}")
+        print(f"Saving file to: {file_path}")
+        return file_path
+
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        # No file can be attached; the form is small enough to parse in one go
+        form = await request.form()
+        return {key: value for key, value in form.items() if isinstance(value, str)}, None
+
+    try:
+        spooler = MultipartSpooler(content_type, upload_path_for)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        async for chunk in request.stream():
+            # Parsing, hashing and disk writes stay off the event loop
+            await run_in_threadpool(spooler.feed, chunk)
+        return await run_in_threadpool(spooler.finish)
+    except BaseException:
+        spooler.abort()
+        raise
+
+async def prepare_teaser_job(request: Request, current_user: SessionData):
+    """
+    Receive and validate the form (method, max_length, min_length and either youtube_url
+    or video_file) and stage the input in a fresh workspace.
+    Returns the keyword arguments for run_teaser_job.
+    """
+    # Create temporary directory with proper permissions
+    temp_dir = create_temp_directory()
+
+    # Save uploaded file with better error handling
+    try:
+        fields, upload = await receive_teaser_form(request, temp_dir)
+    except HTTPException:
+        safe_cleanup_directory(temp_dir)
+        raise
+    except ValueError as e:
+        # Malformed or oversized form (MultipartSpooler rejects it while parsing)
+        safe_cleanup_directory(temp_dir)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as file_error:
+        print(f"Error saving file: {file_error}")
+        safe_cleanup_directory(temp_dir)
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Failed to save uploaded file: {str(file_error)}"
+        )
 
+    try:
+        method = fields.get("method")
+        youtube_url = fields.get("youtube_url") or None
+        if method is None:
+            raise HTTPException(status_code=422, detail="Field 'method' is required")
+        try:
+            max_length = int(fields.get("max_length", 70))
+            min_length = int(fields.get("min_length", 60))
+        except ValueError:
+            raise HTTPException(status_code=422, detail="max_length and min_length must be integers")
+
+        if not youtube_url and not upload:
+            raise HTTPException(status_code=400, detail="Either YouTube URL or video file must be provided")
+        if youtube_url and upload:
+            raise HTTPException(status_code=400, detail="Provide either YouTube URL or video file, not both")
+        
+        valid_methods = ["learning_a", "learning_b", "cinematic_a", "gemini"]
+        if method not in valid_methods:
+            raise HTTPException(status_code=400, detail=f"Method must be one of: {', '.join(valid_methods)}")
     except HTTPException:
-        # Re-raise HTTP exceptions as-is
+        if upload:
+            upload.abort()
+        safe_cleanup_directory(temp_dir)
         raise
+
+    job_kwargs = {
+        "user_email": current_user.email,
+        "temp_dir": temp_dir,
+        "method": method,
+        "max_length": max_length,
+        "min_length": min_length,
+    }
+
+    if youtube_url:
+        print(f"Processing YouTube URL: {youtube_url}")
+        job_kwargs.update(input_source=youtube_url, is_youtube=True, youtube_url=youtube_url)
+        return job_kwargs
+
+    print(f"File saved successfully: {upload.path}")
+    print(f"File size: {upload.size} bytes")
+
+    job_kwargs.update(
+        input_source=upload.path, is_youtube=False, youtube_url=None,
+        content_hash=upload.content_hash, ingest=upload.ingest
+    )
+    return job_kwargs
+
+def submit_teaser_job(job_kwargs):
+    """
+    Hand a prepared teaser job to the worker pool and return its job id.
+    """
+    params = {key: job_kwargs[key] for key in ("method", "max_length", "min_length", "youtube_url")}
+    try:
+        return job_queue.submit(run_teaser_job, owner=job_kwargs["user_email"], params=params, **job_kwargs)
+    except QueueFullError as e:
+        if job_kwargs.get("ingest"):
+            job_kwargs["ingest"].cancel()
+        safe_cleanup_directory(job_kwargs["temp_dir"])
+        raise HTTPException(status_code=503, detail=str(e))
+
+def get_owned_job(job_id: str, current_user: SessionData):
+    job = job_queue.get(job_id)
+    if not job or job["owner"] != current_user.email:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/generate-teaser")
+async def generate_teaser(request: Request, current_user: SessionData = Depends(get_current_user)):
+    """
+    Generate a teaser video from either YouTube URL or uploaded file.
+    Form fields: method, max_length (70), min_length (60), youtube_url or video_file.
+    The pipeline runs on the job worker pool; this request waits for it without blocking the event loop.
+    """
+    job_kwargs = await prepare_teaser_job(request, current_user)
+    job_id = submit_teaser_job(job_kwargs)
+
+    try:
+        result = await asyncio.wrap_future(job_queue.future(job_id))
+        return JSONResponse(content=result)
+
     except PermissionError as pe:
         print(f"Permission error details: {pe}")
         raise HTTPException(
@@ -350,9 +472,43 @@ async def generate_teaser(
     except Exception as e:
         print(f"Unexpected error: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing video: {str(e)}")
-    finally:
-        # Clean up temporary directory
-        safe_cleanup_directory(temp_dir)
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request, current_user: SessionData = Depends(get_current_user)):
+    """
+    Queue a teaser job and return its id right away (same form fields as /generate-teaser).
+    Poll /jobs/{job_id} for status and /jobs/{job_id}/result for the teaser.
+    """
+    job_kwargs = await prepare_teaser_job(request, current_user)
+    job_id = submit_teaser_job(job_kwargs)
+    return {"job_id": job_id, "status": JOB_QUEUED}
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str, current_user: SessionData = Depends(get_current_user)):
+    """
+    Get the status of a queued teaser job
+    """
+    job = get_owned_job(job_id, current_user)
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "params": job["params"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"]
+    }
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, current_user: SessionData = Depends(get_current_user)):
+    """
+    Get the result of a finished teaser job (202 while it is still queued or running)
+    """
+    job = get_owned_job(job_id, current_user)
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(status_code=500, detail=f"Error processing video: {job['error']}")
+    if job["status"] != JOB_SUCCEEDED:
+        return JSONResponse(status_code=202, content={"job_id": job_id, "status": job["status"]})
+    return JSONResponse(content=job["result"])
 
 @app.get("/me")
 async def get_current_user_info(current_user: SessionData = Depends(get_current_user)):
@@ -0,0 +1,210 @@
+# metrics.py
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Latency buckets in seconds, from quick stages (cleaning, embedding) up to long transcriptions
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues)) + list(extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+# -------------------------------
+# Metric Types
+# -------------------------------
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """
+    A gauge that is either set explicitly or read from a callback at scrape time.
+    """
+
+    def __init__(self, name, documentation, fn=None):
+        self.name = name
+        self.documentation = documentation
+        self._fn = fn
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def value(self):
+        if self._fn is not None:
+            return self._fn()
+        with self._lock:
+            return self._value
+
+    def render(self):
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(self.value())}",
+        ]
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labelnames, key, [("le", "+Inf")])
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+# -------------------------------
+# Registry
+# -------------------------------
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            # Re-registering a name (e.g. on module reload) returns the existing metric
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, fn=None):
+        return self._register(Gauge(name, documentation, fn))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry exposed at /metrics
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "teaser_stage_seconds",
+    "Wall time of each teaser pipeline stage in seconds.",
+    ["stage"]
+)
+STAGE_FAILURES = metrics.counter(
+    "teaser_stage_failures_total",
+    "Number of pipeline stage runs that raised an exception.",
+    ["stage"]
+)
+
+
+_stage_listeners = []
+
+
+def add_stage_listener(listener):
+    """
+    Call listener(stage, start, end, cpu_seconds) after every timed stage.
+    start/end are time.perf_counter() values; cpu_seconds is the stage thread's CPU time
+    plus CPU used by child processes (ffmpeg) meanwhile, which overlaps when stages run concurrently.
+    Used by the benchmark harness.
+    """
+    _stage_listeners.append(listener)
+
+
+def remove_stage_listener(listener):
+    _stage_listeners.remove(listener)
+
+
+def _children_cpu_seconds():
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+@contextmanager
+def time_stage(stage):
+    """
+    Record the wall time of the wrapped block under teaser_stage_seconds{stage=...}.
+    """
+    start = time.perf_counter()
+    cpu_start = time.thread_time() + _children_cpu_seconds() if _stage_listeners else 0.0
+    try:
+        yield
+    except Exception:
+        STAGE_FAILURES.inc(stage=stage)
+        raise
+    finally:
+        end = time.perf_counter()
+        STAGE_SECONDS.observe(end - start, stage=stage)
+        if _stage_listeners:
+            cpu_seconds = time.thread_time() + _children_cpu_seconds() - cpu_start
+            for listener in list(_stage_listeners):
+                listener(stage, start, end, cpu_seconds)
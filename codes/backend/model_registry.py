@@ -0,0 +1,147 @@
+# model_registry.py
+import gc
+import importlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Import centralized configuration
+from config import MODEL_MEMORY_BUDGET_MB
+
+
+# -------------------------------
+# Size Estimation
+# -------------------------------
+def estimate_model_size_mb(model):
+    """
+    Estimate the memory held by a model from its parameters and buffers.
+    Tuples/lists (e.g. BLIP's (processor, model, device)) are summed; anything else counts as 0.
+    """
+    if isinstance(model, (tuple, list)):
+        return sum(estimate_model_size_mb(item) for item in model)
+
+    total_bytes = 0
+    for attr in ("parameters", "buffers"):
+        tensors = getattr(model, attr, None)
+        if callable(tensors):
+            total_bytes += sum(t.numel() * t.element_size() for t in tensors())
+    return total_bytes / (1024 * 1024)
+
+
+def _release_memory():
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+# -------------------------------
+# Model Registry
+# -------------------------------
+class ModelRegistry:
+    """
+    Loads each registered model once per process and keeps it warm.
+    When the loaded models exceed the memory budget, the least recently used ones are evicted.
+    """
+
+    def __init__(self, memory_budget_mb=MODEL_MEMORY_BUDGET_MB):
+        self.memory_budget_mb = memory_budget_mb
+        self._loaders = {}
+        self._models = OrderedDict()  # name -> (model, size_mb), oldest first
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def register(self, name, loader):
+        """
+        Register a zero-argument loader for a model name. Re-registering replaces the loader.
+        loader may also be a "module:function" path, imported only when the model is first loaded.
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._load_locks.setdefault(name, threading.Lock())
+
+    def get(self, name):
+        """
+        Return the model for name, loading it on first use.
+        """
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name][0]
+            if name not in self._loaders:
+                raise KeyError(f"No model registered under '{name}'")
+            load_lock = self._load_locks[name]
+
+        # Only one thread loads a given model; the others wait and reuse it
+        with load_lock:
+            with self._lock:
+                if name in self._models:
+                    self._models.move_to_end(name)
+                    return self._models[name][0]
+                loader = self._loaders[name]
+
+            if isinstance(loader, str):
+                module_name, function_name = loader.split(":")
+                loader = getattr(importlib.import_module(module_name), function_name)
+
+            print(f"[INFO] Loading model '{name}'...")
+            start = time.perf_counter()
+            model = loader()
+            size_mb = estimate_model_size_mb(model)
+            print(f"[INFO] Loaded model '{name}' ({size_mb:.0f} MB) in {time.perf_counter() - start:.2f}s")
+
+            with self._lock:
+                self._models[name] = (model, size_mb)
+                self._evict_over_budget(keep=name)
+            return model
+
+    def preload(self, names):
+        """
+        Load the given models ahead of the first request (e.g. at API startup).
+        """
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"[ERROR] Failed to preload model '{name}': {e}")
+
+    def evict(self, name):
+        with self._lock:
+            evicted = self._models.pop(name, None)
+        if evicted is not None:
+            print(f"[INFO] Evicted model '{name}'")
+            del evicted
+            _release_memory()
+
+    def loaded(self):
+        """
+        Return {name: size_mb} for the models currently held, least recently used first.
+        """
+        with self._lock:
+            return {name: size_mb for name, (_, size_mb) in self._models.items()}
+
+    def _evict_over_budget(self, keep):
+        # Caller holds self._lock
+        evicted = []
+        while sum(size for _, size in self._models.values()) > self.memory_budget_mb:
+            name = next((n for n in self._models if n != keep), None)
+            if name is None:
+                break
+            self._models.pop(name)
+            evicted.append(name)
+        for name in evicted:
+            print(f"[INFO] Evicted model '{name}' to stay within {self.memory_budget_mb} MB")
+        if evicted:
+            _release_memory()
+
+
+# Process-wide registry shared by all pipeline stages
+model_registry = ModelRegistry()
+
+# Loaders are referenced by path so the stage modules (and torch) are only imported on first use
+model_registry.register("whisper", "transcribe_audio_from_whisper:load_whisper_model")
+model_registry.register("faster_whisper", "transcription_backends:load_faster_whisper_model")
+model_registry.register("blip", "get_description_from_blip:load_blip_model")
+model_registry.register("blip_int8", "get_description_from_blip:load_blip_int8_model")
+model_registry.register("sentence_transformer", "create_embeddings_and_query:load_embedding_model")
@@ -1,5 +1,3 @@
-import ollama
-import pyttsx3
 import os
 import re 
 import syllables
@@ -26,6 +24,8 @@ def summarize_text(transcript, duration_seconds, wpm, model='llama3.2:latest'):
     """
 
     try:
+        import ollama
+
         print(f"Sending request to Ollama model '{model}'...")
         response = ollama.chat(model=model, messages=[{'role': 'user', 'content': prompt}])
         summary = response['message']['content'].strip()
@@ -43,6 +43,8 @@ def create_timed_audio(text, duration_seconds, filename="summary_audio.mp3"):
         required_wpm = (actual_word_count * 60) / duration_seconds
         print("\n--- Audio Generation ---")
         print(f"Required audio speaking rate: {required_wpm:.2f} WPM")
+        import pyttsx3
+
         engine = pyttsx3.init()
         engine.setProperty('rate', required_wpm)
         engine.save_to_file(text, filename)
@@ -0,0 +1,127 @@
+# pipeline_dag.py
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+
+class Stage:
+    """
+    A named unit of work. fn is called with the outputs of its dependencies as keyword arguments.
+    pool is "thread" (default) or "process"; process stages need a picklable fn and inputs.
+    """
+
+    def __init__(self, name, fn, deps=(), pool="thread"):
+        if pool not in ("thread", "process"):
+            raise ValueError(f"Unknown pool for stage '{name}': {pool}")
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.pool = pool
+
+
+# -------------------------------
+# Stage DAG
+# -------------------------------
+class PipelineDAG:
+    """
+    Runs stages as soon as their dependencies finish, so independent stages overlap.
+    After run(), timings holds per-stage start/end offsets and the job's critical path.
+    """
+
+    def __init__(self, max_workers=4, max_processes=None):
+        self.max_workers = max_workers
+        self.max_processes = max_processes
+        self.stages = {}
+        self.timings = None
+
+    def add(self, name, fn, deps=(), pool="thread"):
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        missing = [dep for dep in deps if dep not in self.stages]
+        if missing:
+            # Stages must be added after their dependencies, which also rules out cycles
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {missing}")
+        self.stages[name] = Stage(name, fn, deps, pool)
+
+    def run(self):
+        """
+        Execute every stage and return {stage_name: output}.
+        The first stage failure cancels stages that have not started and is re-raised.
+        """
+        results = {}
+        spans = {}
+        pending = dict(self.stages)
+        running = {}
+        submitted_at = {}
+        run_start = time.perf_counter()
+
+        uses_processes = any(stage.pool == "process" for stage in self.stages.values())
+        threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage")
+        processes = ProcessPoolExecutor(max_workers=self.max_processes) if uses_processes else None
+
+        def timed(fn, kwargs):
+            start = time.perf_counter()
+            output = fn(**kwargs)
+            return output, start, time.perf_counter()
+
+        try:
+            while pending or running:
+                ready = [stage for stage in pending.values() if all(dep in results for dep in stage.deps)]
+                for stage in ready:
+                    del pending[stage.name]
+                    kwargs = {dep: results[dep] for dep in stage.deps}
+                    if stage.pool == "process":
+                        # Time process stages from the parent; the child clock is not comparable
+                        future = processes.submit(stage.fn, **kwargs)
+                        submitted_at[future] = time.perf_counter()
+                    else:
+                        future = threads.submit(timed, stage.fn, kwargs)
+                    running[future] = stage
+
+                if not running:
+                    raise RuntimeError(f"Stages cannot be scheduled: {sorted(pending)}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    if stage.pool == "process":
+                        output, start, end = future.result(), submitted_at.pop(future), time.perf_counter()
+                    else:
+                        output, start, end = future.result()
+                    results[stage.name] = output
+                    spans[stage.name] = (start - run_start, end - run_start)
+        except Exception:
+            for future in running:
+                future.cancel()
+            raise
+        finally:
+            threads.shutdown(wait=True, cancel_futures=True)
+            if processes is not None:
+                processes.shutdown(wait=True, cancel_futures=True)
+            self.timings = self._timing_report(spans, time.perf_counter() - run_start)
+
+        return results
+
+    def _timing_report(self, spans, wall_seconds):
+        # Longest chain of dependent stage durations, in insertion (= topological) order
+        chain = {}
+        for name, stage in self.stages.items():
+            if name not in spans:
+                continue
+            duration = spans[name][1] - spans[name][0]
+            previous = max((chain[dep] for dep in stage.deps if dep in chain), key=lambda c: c[0], default=(0.0, []))
+            chain[name] = (previous[0] + duration, previous[1] + [name])
+
+        critical_seconds, critical_path = max(chain.values(), key=lambda c: c[0], default=(0.0, []))
+        return {
+            "wall_seconds": round(wall_seconds, 3),
+            "critical_path": critical_path,
+            "critical_path_seconds": round(critical_seconds, 3),
+            "stages": {
+                name: {
+                    "start": round(start, 3),
+                    "end": round(end, 3),
+                    "seconds": round(end - start, 3),
+                }
+                for name, (start, end) in spans.items()
+            },
+        }
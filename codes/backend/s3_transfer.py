@@ -0,0 +1,163 @@
+# s3_transfer.py
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+# Import centralized configuration
+from config import (
+    AWS_ACCESS_KEY, AWS_SECRET_KEY, AWS_REGION, BUCKET_NAME,
+    S3_BACKEND, S3_LOCAL_DIR, S3_UPLOAD_WORKERS, S3_MAX_CONCURRENCY, S3_MULTIPART_CHUNK_MB
+)
+from artifact_cache import file_content_hash
+from metrics import time_stage
+
+
+# -------------------------------
+# S3 Clients
+# -------------------------------
+class LocalS3Client:
+    """
+    Filesystem-backed stand-in for the subset of the boto3 S3 client used here
+    (upload_file and head_object). Objects live under root/<bucket>/<key>.
+    """
+
+    def __init__(self, root=S3_LOCAL_DIR):
+        self.root = Path(root)
+
+    def _object_path(self, bucket, key):
+        return self.root / bucket / key
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Callback=None, Config=None):
+        path = self._object_path(Bucket, Key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(Filename, path)
+
+    def head_object(self, Bucket, Key):
+        path = self._object_path(Bucket, Key)
+        if not path.exists():
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        return {"ContentLength": path.stat().st_size}
+
+
+def create_s3_client(backend=S3_BACKEND):
+    """
+    Build the S3 client selected by S3_BACKEND ("aws" or "local").
+    """
+    if backend == "aws":
+        return boto3.client(
+            "s3",
+            aws_access_key_id=AWS_ACCESS_KEY,
+            aws_secret_access_key=AWS_SECRET_KEY,
+            region_name=AWS_REGION
+        )
+    if backend == "local":
+        return LocalS3Client()
+    raise ValueError(f"Unknown S3 backend: {backend}")
+
+
+def s3_object_url(s3_key, bucket=BUCKET_NAME):
+    """Return the https object URL for a key."""
+    return f"https://{bucket}.s3.{AWS_REGION}.amazonaws.com/{s3_key}"
+
+
+# -------------------------------
+# Transfer Manager
+# -------------------------------
+class S3TransferManager:
+    """
+    Uploads files in the background with tuned multipart settings.
+    upload() and upload_deduplicated() return futures that resolve to the object URL.
+    """
+
+    def __init__(self, client=None, bucket=BUCKET_NAME, max_workers=S3_UPLOAD_WORKERS):
+        self._client = client
+        self._client_lock = threading.Lock()
+        self.bucket = bucket
+        self.transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_CHUNK_MB * 1024 * 1024,
+            multipart_chunksize=S3_MULTIPART_CHUNK_MB * 1024 * 1024,
+            max_concurrency=S3_MAX_CONCURRENCY,
+            use_threads=True
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-upload")
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._client_lock:
+            if self._client is None:
+                self._client = create_s3_client()
+            return self._client
+
+    def object_exists(self, s3_key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=s3_key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def _upload(self, local_file_path, s3_key, extra_args=None):
+        print(f"[INFO] Uploading {local_file_path} to s3://{self.bucket}/{s3_key}")
+        with time_stage("upload"):
+            self.client.upload_file(
+                local_file_path, self.bucket, s3_key,
+                ExtraArgs=extra_args, Config=self.transfer_config
+            )
+        object_url = s3_object_url(s3_key, self.bucket)
+        print(f"[INFO] Upload successful: {object_url}")
+        return object_url
+
+    def _submit_once(self, s3_key, fn, *args):
+        # Concurrent requests for the same key share one upload
+        with self._in_flight_lock:
+            future = self._in_flight.get(s3_key)
+            if future is not None and not future.done():
+                return future
+            future = self._executor.submit(fn, *args)
+            self._in_flight[s3_key] = future
+        # Outside the lock: the callback runs immediately if the upload already finished
+        future.add_done_callback(lambda f, key=s3_key: self._forget(key, f))
+        return future
+
+    def _forget(self, s3_key, future):
+        with self._in_flight_lock:
+            if self._in_flight.get(s3_key) is future:
+                del self._in_flight[s3_key]
+
+    def upload(self, local_file_path, s3_key):
+        """Upload a file to s3_key in the background. Returns a future of the object URL."""
+        return self._submit_once(s3_key, self._upload, local_file_path, s3_key)
+
+    def upload_deduplicated(self, local_file_path, prefix, content_hash=None):
+        """
+        Upload a file under <prefix>/<sha256><ext> unless an object with that content
+        hash already exists. Returns a future of the object URL.
+        """
+        def run(content_hash):
+            content_hash = content_hash or file_content_hash(local_file_path)
+            s3_key = f"{prefix}/{content_hash}{os.path.splitext(local_file_path)[1]}"
+            if self.object_exists(s3_key):
+                print(f"[INFO] Skipping upload, s3://{self.bucket}/{s3_key} already exists")
+                return s3_object_url(s3_key, self.bucket)
+            return self._upload(local_file_path, s3_key, {"Metadata": {"sha256": content_hash}})
+
+        if content_hash is None:
+            return self._executor.submit(run, None)
+        s3_key = f"{prefix}/{content_hash}{os.path.splitext(local_file_path)[1]}"
+        return self._submit_once(s3_key, run, content_hash)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+# Process-wide transfer manager (the S3 client is created on first use)
+transfer_manager = S3TransferManager()
@@ -0,0 +1,129 @@
+# segments.py
+import re
+
+import numpy as np
+
+VISUAL_SEGMENT_SECONDS = 1.5  # a caption stands for this much video after its frame
+
+_LINE_PATTERN = re.compile(r"\[(\d+\.?\d*)s(?:\s*-\s*(\d+\.?\d*)s)?\]\s?(.*)", re.DOTALL)
+
+
+# -------------------------------
+# Segment Table
+# -------------------------------
+class SegmentTable:
+    """
+    Timestamped text segments stored as columns: float64 start/end arrays (seconds) and a list of texts.
+    Audio segments carry their real end times; visual segments are points, stored with
+    end = start + VISUAL_SEGMENT_SECONDS. Timestamp strings only exist at the JSON boundary
+    (to_records / from_records).
+    """
+    __slots__ = ("start", "end", "text", "point")
+
+    def __init__(self, start=(), end=(), text=(), point=False):
+        self.start = np.asarray(start, dtype=np.float64)
+        self.end = np.asarray(end, dtype=np.float64)
+        self.text = list(text)
+        self.point = point
+
+    @classmethod
+    def from_segments(cls, segments):
+        """Audio segments from (start, end, text) tuples, rounded to centiseconds like the transcript."""
+        segments = list(segments)
+        times = np.round(np.array([(start, end) for start, end, _ in segments], dtype=np.float64).reshape(-1, 2), 2)
+        return cls(times[:, 0], times[:, 1], [text for _, _, text in segments])
+
+    @classmethod
+    def from_points(cls, timestamps, texts):
+        """Visual segments from frame timestamps (seconds) and their captions."""
+        start = np.round(np.asarray(timestamps, dtype=np.float64), 2)
+        return cls(start, start + VISUAL_SEGMENT_SECONDS, texts, point=True)
+
+    @classmethod
+    def concat(cls, tables, point=False):
+        tables = list(tables)
+        if not tables:
+            return cls(point=point)
+        return cls(
+            np.concatenate([t.start for t in tables]),
+            np.concatenate([t.end for t in tables]),
+            [text for t in tables for text in t.text],
+            point=tables[0].point
+        )
+
+    def __len__(self):
+        return len(self.text)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, SegmentTable)
+            and self.point == other.point
+            and self.text == other.text
+            and np.array_equal(self.start, other.start)
+            and np.array_equal(self.end, other.end)
+        )
+
+    @property
+    def durations(self):
+        return self.end - self.start
+
+    def take(self, indices):
+        """Rows at the given indices (or boolean mask), in that order."""
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        return SegmentTable(self.start[indices], self.end[indices], [self.text[i] for i in indices], self.point)
+
+    def sorted(self):
+        return self.take(np.argsort(self.start, kind="stable"))
+
+    def with_text(self, text):
+        return SegmentTable(self.start, self.end, text, self.point)
+
+    def timestamps(self):
+        """[[start, end], ...] as plain floats."""
+        return np.column_stack((self.start, self.end)).tolist()
+
+    # -------------------------------
+    # JSON Boundary
+    # -------------------------------
+    def to_json(self):
+        """Compact column form for the artifact cache."""
+        return {"start": self.start.tolist(), "end": self.end.tolist(), "text": self.text, "point": self.point}
+
+    @classmethod
+    def from_json(cls, value):
+        return cls(value["start"], value["end"], value["text"], value.get("point", False))
+
+    def to_records(self):
+        """[{'timestamp': '[0.00s - 4.23s]' (or '[0.00s]' for points), 'text': ...}, ...]"""
+        if self.point:
+            return [{"timestamp": f"[{start:.2f}s]", "text": text} for start, text in zip(self.start, self.text)]
+        return [
+            {"timestamp": f"[{start:.2f}s - {end:.2f}s]", "text": text}
+            for start, end, text in zip(self.start, self.end, self.text)
+        ]
+
+    @classmethod
+    def from_lines(cls, lines, point=None):
+        """
+        Parse '[0.00s - 4.23s] text' / '[0.00s] text' lines; malformed lines are skipped.
+        point says whether these are visual (point) segments; when None it is inferred from the
+        lines, which an empty list cannot tell, so callers that know should pass it.
+        """
+        starts, ends, texts = [], [], []
+        inferred = False
+        for line in lines:
+            match = _LINE_PATTERN.match(line)
+            if not match:
+                continue
+            start = float(match.group(1))
+            inferred = match.group(2) is None
+            starts.append(start)
+            ends.append(start + VISUAL_SEGMENT_SECONDS if point or inferred else float(match.group(2)))
+            texts.append(match.group(3))
+        return cls(starts, ends, texts, point=inferred if point is None else point)
+
+    @classmethod
+    def from_records(cls, records, point=None):
+        return cls.from_lines([f"{record['timestamp']} {record['text']}" for record in records], point)
@@ -0,0 +1,66 @@
+# text_normalizer.py
+import re
+
+
+# -------------------------------
+# Pattern Building
+# -------------------------------
+def _trie_pattern(phrases):
+    """
+    Regex source matching any of the phrases, built from a character trie so shared
+    prefixes are tested once ("um", "uh" -> "u(?:h|m)"). Longer phrases win over their prefixes.
+    Spaces inside a phrase match any run of whitespace.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in " ".join(phrase.lower().split()):
+            node = node.setdefault(char, {})
+        node[""] = {}  # end of a phrase
+
+    def build(node):
+        ends = "" in node
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends:
+            # A phrase may also stop here; try the longer continuation first
+            return f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+# -------------------------------
+# Text Normalizer
+# -------------------------------
+class TextNormalizer:
+    """
+    Removes filler phrases (whole words, anywhere) and leading prefixes (one or more at the start),
+    then collapses whitespace. Both dictionaries are compiled into a single case-insensitive
+    regex once, so each text is cleaned with one regex pass plus a split/join.
+    """
+
+    def __init__(self, fillers=(), prefixes=()):
+        alternatives = []
+        if prefixes:
+            alternatives.append(rf"\A(?:(?:{_trie_pattern(prefixes)})\b\s*)+")
+        if fillers:
+            alternatives.append(rf"\b(?:{_trie_pattern(fillers)})\b")
+        self._pattern = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+
+    def normalize(self, text):
+        if self._pattern is not None:
+            text = self._pattern.sub("", text)
+        return " ".join(text.split())
+
+    def normalize_many(self, texts):
+        """Normalize a batch of texts (same result as normalize on each)."""
+        if self._pattern is None:
+            return [" ".join(text.split()) for text in texts]
+        sub = self._pattern.sub
+        return [" ".join(sub("", text).split()) for text in texts]
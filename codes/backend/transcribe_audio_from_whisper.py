@@ -1,39 +1,69 @@
 # transcribe_audio_from_whisper.py
-import torch
-import whisper_timestamped as whisper
 import os
 
 # Import centralized configuration
-from config import FFMPEG_PATH
+from config import FFMPEG_PATH, WHISPER_MODEL, TRANSCRIBE_MODE, TRANSCRIBE_BACKEND
+from model_registry import model_registry
+from metrics import time_stage
+from segments import SegmentTable
 
 # Set FFmpeg path for whisper
 os.environ['PATH'] = FFMPEG_PATH + os.pathsep + os.environ['PATH']
 
-def transcribe_audio(audio_path: str) -> str:
+def load_whisper_model():
     """
-    Transcribe audio using Whisper Timestamped.
-    Returns a string of timestamped segments.
+    Load the Whisper model named by config.WHISPER_MODEL.
+    """
+    import torch
+    import whisper_timestamped as whisper
+
+    DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+    return whisper.load_model(WHISPER_MODEL, device=DEVICE)
+
+def transcribe_single(audio_path: str, backend: str = TRANSCRIBE_BACKEND) -> list:
+    """
+    Transcribe the whole 16 kHz WAV with one call to the backend (the full track is held as float32).
+    Returns [(start, end, text), ...] in seconds.
+    """
+    from transcription_backends import get_transcription_backend
+    from transcription_engine import open_wav
+
+    backend = get_transcription_backend(backend)
+    with open_wav(audio_path) as audio:
+        samples = audio.window()
+    _, segments = backend.transcribe(model_registry.get(backend.model_name), samples)
+    return segments
+
+def stream_transcription(audio_path: str, mode: str = TRANSCRIBE_MODE, backend: str = TRANSCRIBE_BACKEND):
+    """
+    Transcribe audio with the configured backend (see transcription_backends), yielding
+    a SegmentTable batch as soon as each part is available, in timeline order.
+    mode "chunked" transcribes only detected speech, in parallel windows, and yields one
+    batch per window (see transcription_engine); mode "single" passes the whole file to
+    one backend call and yields a single batch.
     """
     # Verify the audio file exists
     if not os.path.exists(audio_path):
         raise FileNotFoundError(f"Audio file not found: {audio_path}")
-    
-    DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
-    model = whisper.load_model("small", device=DEVICE)
-    
+
     try:
-        audio = whisper.load_audio(audio_path)
-        result = whisper.transcribe(model, audio)
-        
-        # Build formatted string of timestamped segments
-        timestamped_segments = []
-
-        for segment in result["segments"]:
-            timestamp = f"[{segment['start']:.2f}s - {segment['end']:.2f}s]"
-            line = f"{timestamp} {segment['text']}"
-            timestamped_segments.append(line)
-
-        return timestamped_segments
+        # The stage spans until the last batch, including the consumer's time between batches
+        with time_stage("transcription"):
+            if mode == "chunked":
+                from transcription_engine import iter_transcribe_chunked
+                for segments in iter_transcribe_chunked(audio_path, backend=backend):
+                    yield SegmentTable.from_segments(segments)
+            elif mode == "single":
+                yield SegmentTable.from_segments(transcribe_single(audio_path, backend))
+            else:
+                raise ValueError(f"Unknown transcription mode: {mode}")
     except Exception as e:
         print(f"[ERROR] Audio transcription failed: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def transcribe_audio(audio_path: str, mode: str = TRANSCRIBE_MODE, backend: str = TRANSCRIBE_BACKEND) -> SegmentTable:
+    """
+    Transcribe audio with the configured backend.
+    Returns a SegmentTable of the timestamped segments.
+    """
+    return SegmentTable.concat(stream_transcription(audio_path, mode, backend))
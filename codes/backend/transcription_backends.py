@@ -0,0 +1,88 @@
+# transcription_backends.py
+# Import centralized configuration
+from config import WHISPER_MODEL, TRANSCRIBE_BACKEND, FASTER_WHISPER_COMPUTE_TYPE
+
+
+# -------------------------------
+# Backend Interface
+# -------------------------------
+class TranscriptionBackend:
+    """
+    A speech-to-text implementation. transcribe() takes 16 kHz mono float32 samples and
+    returns (language, [(start, end, text), ...]) with times in seconds from the first sample.
+    The loaded model lives in model_registry under model_name.
+    """
+    name = None
+    model_name = None
+
+    def limit_threads(self, threads):
+        """Cap the CPU threads this backend uses in the current process."""
+
+    def transcribe(self, model, samples, language=None):
+        raise NotImplementedError
+
+
+class WhisperTimestampedBackend(TranscriptionBackend):
+    """OpenAI Whisper on PyTorch (fp32 on CPU) through whisper_timestamped."""
+    name = "whisper_timestamped"
+    model_name = "whisper"
+
+    def limit_threads(self, threads):
+        import torch
+        torch.set_num_threads(threads)
+
+    def transcribe(self, model, samples, language=None):
+        import whisper_timestamped as whisper
+
+        result = whisper.transcribe(model, samples, language=language)
+        return result["language"], [(segment["start"], segment["end"], segment["text"]) for segment in result["segments"]]
+
+
+# CPU threads for CTranslate2 (0 = its default); set before the model is loaded
+_faster_whisper_threads = 0
+
+
+def load_faster_whisper_model():
+    """
+    Load config.WHISPER_MODEL as a CTranslate2 model with config.FASTER_WHISPER_COMPUTE_TYPE weights.
+    """
+    try:
+        from faster_whisper import WhisperModel
+    except ImportError as e:
+        raise RuntimeError(
+            "TRANSCRIBE_BACKEND=faster_whisper needs the faster-whisper package (pip install faster-whisper)"
+        ) from e
+
+    return WhisperModel(
+        WHISPER_MODEL,
+        device="auto",
+        compute_type=FASTER_WHISPER_COMPUTE_TYPE,
+        cpu_threads=_faster_whisper_threads
+    )
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """Whisper on CTranslate2 (faster-whisper), int8-quantized by default."""
+    name = "faster_whisper"
+    model_name = "faster_whisper"
+
+    def limit_threads(self, threads):
+        global _faster_whisper_threads
+        _faster_whisper_threads = threads
+
+    def transcribe(self, model, samples, language=None):
+        # Greedy decoding like whisper_timestamped's default; silence is already removed upstream
+        segments, info = model.transcribe(samples, language=language, beam_size=1, vad_filter=False)
+        return info.language, [(segment.start, segment.end, segment.text) for segment in segments]
+
+
+TRANSCRIPTION_BACKENDS = {
+    backend.name: backend for backend in (WhisperTimestampedBackend(), FasterWhisperBackend())
+}
+
+
+def get_transcription_backend(name=TRANSCRIBE_BACKEND):
+    try:
+        return TRANSCRIPTION_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown transcription backend: {name}") from None
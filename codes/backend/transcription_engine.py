@@ -0,0 +1,281 @@
+# transcription_engine.py
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Import centralized configuration
+from config import (
+    TRANSCRIBE_BACKEND, TRANSCRIBE_WORKERS, TRANSCRIBE_WINDOW_SECONDS, TRANSCRIBE_OVERLAP_SECONDS, TRANSCRIBE_LANGUAGE,
+    VAD_ENABLED, VAD_MARGIN_DB, VAD_MIN_SILENCE_SECONDS
+)
+from transcription_backends import get_transcription_backend
+from wav_reader import MappedWav
+
+SAMPLE_RATE = 16000  # the ingest writes 16 kHz mono PCM16 for Whisper
+
+
+# -------------------------------
+# Audio + Voice Activity Detection
+# -------------------------------
+def open_wav(audio_path):
+    """
+    Memory-map the 16 kHz PCM16 Whisper WAV; samples are only converted window by window.
+    """
+    audio = MappedWav(audio_path)
+    if audio.sample_rate != SAMPLE_RATE:
+        raise ValueError(f"Expected 16 kHz PCM16 audio: {audio_path}")
+    return audio
+
+
+def detect_speech(audio, sample_rate=SAMPLE_RATE, margin_db=VAD_MARGIN_DB, min_silence_seconds=VAD_MIN_SILENCE_SECONDS,
+                  frame_seconds=0.03, min_speech_seconds=0.25, padding_seconds=0.2):
+    """
+    Energy-based voice activity detection over a MappedWav (energy is computed block by block).
+    Frames louder than the noise floor (10th percentile of frame energy) plus margin_db are speech;
+    pauses shorter than min_silence_seconds are bridged and bursts shorter than min_speech_seconds dropped.
+    Returns [(start_sample, end_sample), ...] in order.
+    """
+    frame = int(sample_rate * frame_seconds)
+    if len(audio) // frame == 0:
+        return []
+
+    energy_db = audio.frame_energy_db(frame)
+    threshold = max(np.percentile(energy_db, 10) + margin_db, -60.0)
+    voiced = energy_db > threshold
+
+    # Start/end frame of every voiced run
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+    regions = []
+    for start, end in zip(starts, ends):
+        if regions and (start - regions[-1][1]) * frame_seconds < min_silence_seconds:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    pad = int(padding_seconds * sample_rate)
+    speech = []
+    for start, end in regions:
+        if (end - start) * frame_seconds < min_speech_seconds:
+            continue
+        start, end = max(0, int(start) * frame - pad), min(len(audio), int(end) * frame + pad)
+        if speech and start <= speech[-1][1]:
+            speech[-1] = (speech[-1][0], end)  # padding made them touch
+        else:
+            speech.append((start, end))
+    return speech
+
+
+# -------------------------------
+# Window Planning + Stitching
+# -------------------------------
+def plan_windows(speech, window_seconds=TRANSCRIBE_WINDOW_SECONDS, overlap_seconds=TRANSCRIBE_OVERLAP_SECONDS,
+                 sample_rate=SAMPLE_RATE, min_piece_seconds=1.0):
+    """
+    Pack speech regions into windows of at most window_seconds of audio; the silence between
+    regions is left out. A region longer than the space left is cut, and the next window
+    starts overlap_seconds before the cut so no word is lost at the boundary.
+    Returns windows as {"pieces": [(start, end), ...], "keep_from": sample|None, "keep_until": sample|None};
+    keep_from/keep_until mark the middle of an overlap, where stitching switches windows.
+    """
+    window = int(window_seconds * sample_rate)
+    overlap = int(overlap_seconds * sample_rate)
+    min_piece = int(min_piece_seconds * sample_rate)
+    if window <= 2 * overlap:
+        raise ValueError("The transcription window must be longer than twice the overlap")
+
+    windows = []
+    current = {"pieces": [], "keep_from": None, "keep_until": None}
+    length = 0
+
+    def flush():
+        nonlocal current, length
+        if current["pieces"]:
+            windows.append(current)
+        current = {"pieces": [], "keep_from": None, "keep_until": None}
+        length = 0
+
+    for region_start, end in speech:
+        start = region_start
+        while start < end:
+            room = window - length
+            if current["pieces"] and room < min(min_piece, end - start):
+                flush()
+                continue
+            take = min(end - start, room)
+            current["pieces"].append((start, start + take))
+            length += take
+            if start + take < end:
+                # Cut inside speech: overlap the next window (never reaching back before the region)
+                # and switch over halfway through the overlap
+                cut = start + take
+                start = max(region_start, cut - overlap)
+                boundary = (start + cut) // 2
+                current["keep_until"] = boundary
+                flush()
+                current["keep_from"] = boundary
+            else:
+                start = end
+    flush()
+    return windows
+
+
+def window_audio(audio, window):
+    """The window's speech pieces as one float32 array (only this window is converted)."""
+    return np.concatenate([audio.window(start, end) for start, end in window["pieces"]])
+
+
+def to_global_seconds(window, seconds, sample_rate=SAMPLE_RATE):
+    """Map a time inside a window's (silence-free) audio back to the source timeline."""
+    sample = seconds * sample_rate
+    offset = 0
+    for start, end in window["pieces"]:
+        if sample <= offset + (end - start):
+            return (start + sample - offset) / sample_rate
+        offset += end - start
+    return window["pieces"][-1][1] / sample_rate
+
+
+def stitch_segments(window, window_segments, sample_rate=SAMPLE_RATE):
+    """
+    Convert one window's (start, end, text) segments to source timestamps, dropping the ones
+    whose midpoint falls in the part of an overlap that belongs to the neighbouring window.
+    """
+    segments = []
+    for start, end, text in window_segments:
+        start, end = to_global_seconds(window, start), to_global_seconds(window, end)
+        middle = (start + end) / 2 * sample_rate
+        if window["keep_from"] is not None and middle < window["keep_from"]:
+            continue
+        if window["keep_until"] is not None and middle >= window["keep_until"]:
+            continue
+        segments.append((start, end, text))
+    return segments
+
+
+# -------------------------------
+# Window Transcription
+# -------------------------------
+def _init_worker(threads, backend):
+    # Split the cores between workers instead of every worker using all of them
+    get_transcription_backend(backend).limit_threads(threads)
+
+
+def transcribe_window(audio_path, window, language=None, backend=TRANSCRIBE_BACKEND):
+    """
+    Transcribe one window of audio_path. Returns (language, [(start, end, text), ...]) in window time.
+    The file is mapped here rather than the samples being sent over, so a pool worker only
+    materializes its own window. The model comes from this process's model_registry,
+    so each pool worker loads it once.
+    """
+    from model_registry import model_registry
+
+    backend = get_transcription_backend(backend)
+    with open_wav(audio_path) as audio:
+        samples = window_audio(audio, window)
+    return backend.transcribe(model_registry.get(backend.model_name), samples, language)
+
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+
+def get_transcription_pool(workers=TRANSCRIBE_WORKERS, backend=TRANSCRIBE_BACKEND):
+    """
+    Process pool shared by all jobs, so each worker loads the model once per process lifetime.
+    Workers are spawned (not forked) because the parent may already hold torch threads.
+    """
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is None or _pool_key != (workers, backend):
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads, backend)
+            )
+            _pool_key = (workers, backend)
+        return _pool
+
+
+def shutdown_transcription_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def iter_transcribe_chunked(audio_path, workers=TRANSCRIBE_WORKERS, language=TRANSCRIBE_LANGUAGE, vad=VAD_ENABLED,
+                            backend=TRANSCRIBE_BACKEND):
+    """
+    Transcribe only the speech in audio_path: VAD drops silence, speech is packed into
+    overlapping windows, windows are transcribed in parallel and stitched back together.
+    Yields each window's [(start, end, text), ...] in source seconds as soon as it and
+    every earlier window are done, so segments arrive in timeline order.
+    With workers <= 1 the windows run in this process on the registry's model.
+    """
+    with open_wav(audio_path) as audio:
+        speech = detect_speech(audio) if vad else [(0, len(audio))]
+        duration = audio.duration
+    windows = plan_windows(speech)
+
+    speech_seconds = sum(end - start for start, end in speech) / SAMPLE_RATE
+    print(f"[INFO] Transcribing {speech_seconds:.1f}s of speech out of {duration:.1f}s in {len(windows)} windows")
+    if not windows:
+        return
+
+    if workers <= 1:
+        submit = None
+    else:
+        pool = get_transcription_pool(workers, backend)
+        submit = lambda i, lang: pool.submit(transcribe_window, audio_path, windows[i], lang, backend)
+
+    def stitched(i, result):
+        return sorted(stitch_segments(windows[i], result[1]), key=lambda segment: segment[0])
+
+    pending = list(range(len(windows)))
+    if language is None:
+        # Detect the language on the first window, then pin it so windows cannot disagree
+        first = pending.pop(0)
+        if submit:
+            result = submit(first, None).result()
+        else:
+            result = transcribe_window(audio_path, windows[first], None, backend)
+        language = result[0]
+        yield stitched(first, result)
+
+    if submit is None:
+        for i in pending:
+            yield stitched(i, transcribe_window(audio_path, windows[i], language, backend))
+        return
+
+    futures = [(i, submit(i, language)) for i in pending]
+    try:
+        for i, future in futures:
+            yield stitched(i, future.result())
+    finally:
+        # The consumer stopped early (or a window failed): drop the windows not started yet
+        for _, future in futures:
+            future.cancel()
+
+
+def transcribe_chunked(audio_path, workers=TRANSCRIBE_WORKERS, language=TRANSCRIBE_LANGUAGE, vad=VAD_ENABLED,
+                       backend=TRANSCRIBE_BACKEND):
+    """
+    Chunked transcription of the whole file (see iter_transcribe_chunked).
+    Returns [(start, end, text), ...] in source seconds, in order.
+    """
+    segments = []
+    for window_segments in iter_transcribe_chunked(audio_path, workers, language, vad, backend):
+        segments.extend(window_segments)
+    segments.sort(key=lambda segment: segment[0])
+    return segments
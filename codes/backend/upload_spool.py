@@ -0,0 +1,242 @@
+# upload_spool.py
+import hashlib
+import threading
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# Import centralized configuration
+from config import UPLOAD_BUFFER_MB, UPLOAD_EARLY_INGEST
+from ingest_video import StreamingIngest, whisper_audio_path
+
+# Give up on early ingest if the container layout is still unknown after this many bytes
+MAX_PROBE_BYTES = 8 * 1024 * 1024
+MAX_FIELD_BYTES = 64 * 1024
+
+
+# -------------------------------
+# Container Probing
+# -------------------------------
+def probe_streamable(header):
+    """
+    Decide from the first bytes of a video whether ffmpeg can decode it front to back
+    (so ingest can start before the whole file has arrived).
+    Returns True or False, or None while more bytes are needed.
+    """
+    if len(header) < 8:
+        return None
+    if header[:4] == b"\x1a\x45\xdf\xa3":  # Matroska / WebM
+        return True
+    if header[0] == 0x47:  # MPEG-TS: a sync byte every 188 bytes
+        if len(header) < 377:
+            return None
+        return header[188] == 0x47 and header[376] == 0x47
+    if header[4:8] == b"ftyp":  # MP4 / MOV: only when the moov atom precedes the media data (faststart)
+        offset = 0
+        while offset + 8 <= len(header):
+            size = int.from_bytes(header[offset:offset + 4], "big")
+            box = bytes(header[offset + 4:offset + 8])
+            if box == b"moov":
+                return True
+            if box == b"mdat":
+                return False
+            if size == 1:  # 64-bit box size
+                if offset + 16 > len(header):
+                    return None
+                size = int.from_bytes(header[offset + 8:offset + 16], "big")
+            if size < 8:  # 0 means "to the end of the file"
+                return False
+            offset += size
+        return None
+    return False
+
+
+# -------------------------------
+# Upload Spool
+# -------------------------------
+class UploadSpool:
+    """
+    Writes an incoming upload to its final place in the job workspace in large writes,
+    hashing the bytes as they arrive. For streamable containers the single-pass ingest
+    (StreamingIngest) starts as soon as the header is seen and follows the file as it grows.
+    """
+
+    def __init__(self, path, buffer_size=UPLOAD_BUFFER_MB * 1024 * 1024, early_ingest=UPLOAD_EARLY_INGEST):
+        self.path = path
+        self.audio_path = whisper_audio_path(path)
+        self.buffer_size = buffer_size
+        self.size = 0
+        self.content_hash = None
+        self.ingest = None
+
+        self._file = open(path, "wb")
+        self._buffer = bytearray()
+        self._hash = hashlib.sha256()
+        self._header = bytearray() if early_ingest else None
+        self._written = 0
+        self._closed = False
+        self._aborted = False
+        self._cond = threading.Condition()
+
+    def write(self, data):
+        self._hash.update(data)
+        self.size += len(data)
+        self._buffer += data
+        if self._header is not None:
+            self._probe(data)
+        if len(self._buffer) >= self.buffer_size:
+            self._flush()
+
+    def _probe(self, data):
+        self._header += data[:MAX_PROBE_BYTES - len(self._header)]
+        streamable = probe_streamable(self._header)
+        if streamable is None and len(self._header) < MAX_PROBE_BYTES:
+            return
+        self._header = None
+        if streamable:
+            print(f"[INFO] Starting ingest of {self.path} while it is being received")
+            self.ingest = StreamingIngest(self.path, self.audio_path, self._follow())
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        self._file.write(self._buffer)
+        self._file.flush()
+        with self._cond:
+            self._written += len(self._buffer)
+            self._cond.notify_all()
+        self._buffer = bytearray()
+
+    def _follow(self):
+        """Yield the spooled bytes in order as they reach disk, until the upload is closed."""
+        with open(self.path, "rb") as f:
+            position = 0
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._written > position or self._closed or self._aborted)
+                    if self._aborted:
+                        return
+                    available = self._written - position
+                    if available == 0:
+                        return
+                data = f.read(available)
+                position += len(data)
+                yield data
+
+    def close(self):
+        """Finish the file and return its sha256 content hash."""
+        self._flush()
+        self._file.close()
+        self.content_hash = self._hash.hexdigest()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        print(f"[INFO] Received {self.size} bytes into {self.path}")
+        return self.content_hash
+
+    def abort(self):
+        """Stop a partial upload and any ingest following it (the caller removes the workspace)."""
+        with self._cond:
+            self._aborted = True
+            self._cond.notify_all()
+        if self.ingest is not None:
+            self.ingest.cancel()
+        self._file.close()
+
+
+# -------------------------------
+# Streaming multipart/form-data
+# -------------------------------
+class MultipartSpooler:
+    """
+    Incremental multipart/form-data parser. Text fields are kept in memory; the file field is
+    written straight to upload_path_for(filename) through an UploadSpool, without the
+    intermediate temporary file a fully parsed form would need.
+    """
+
+    def __init__(self, content_type, upload_path_for, file_field="video_file"):
+        mime_type, params = parse_options_header(content_type)
+        if mime_type != b"multipart/form-data" or b"boundary" not in params:
+            raise ValueError("Expected a multipart/form-data request body")
+
+        self.fields = {}
+        self.upload = None
+        self._upload_path_for = upload_path_for
+        self._file_field = file_field
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._part_name = None
+        self._part_value = None
+
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._part_name = None
+        self._part_value = None
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._part_name = options.get(b"name", b"").decode("latin-1")
+        filename = options.get(b"filename")
+        if filename and self._part_name == self._file_field:
+            if self.upload is not None:
+                raise ValueError(f"Only one '{self._file_field}' file is accepted")
+            self.upload = UploadSpool(self._upload_path_for(filename.decode("utf-8", "replace")))
+        elif filename:
+            self._part_name = None  # other file parts are ignored
+        else:
+            self._part_value = bytearray()
+
+    def _on_part_data(self, data, start, end):
+        if self._part_value is not None:
+            if len(self._part_value) + end - start > MAX_FIELD_BYTES:
+                raise ValueError(f"Form field '{self._part_name}' is too large")
+            self._part_value += data[start:end]
+        elif self._part_name == self._file_field and self.upload is not None:
+            self.upload.write(data[start:end])
+
+    def _on_part_end(self):
+        if self._part_value is not None:
+            self.fields[self._part_name] = self._part_value.decode("utf-8")
+        self._part_value = None
+
+    def feed(self, chunk):
+        """Parse the next chunk of the request body."""
+        self._parser.write(chunk)
+
+    def finish(self):
+        """
+        Complete the parse. Returns (fields, upload); upload is the closed UploadSpool
+        (with content_hash and, for streamable files, a running ingest) or None.
+        """
+        self._parser.finalize()
+        if self.upload is not None:
+            self.upload.close()
+        return self.fields, self.upload
+
+    def abort(self):
+        if self.upload is not None:
+            self.upload.abort()
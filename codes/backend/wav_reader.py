@@ -0,0 +1,96 @@
+# wav_reader.py
+import struct
+
+import numpy as np
+
+
+# -------------------------------
+# Memory-Mapped PCM16 WAV
+# -------------------------------
+class MappedWav:
+    """
+    A 16-bit PCM WAV (like the Whisper WAV written by the ingest) mapped into memory instead of read.
+    pcm() returns zero-copy int16 views; window() converts only the requested range to float32,
+    so memory use depends on the window size, not on the length of the recording.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+            if riff != b"RIFF" or wave_id != b"WAVE":
+                raise ValueError(f"Not a WAV file: {self.path}")
+
+            fmt = None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise ValueError(f"WAV file has no data chunk: {self.path}")
+                chunk_id, size = struct.unpack("<4sI", header)
+                if chunk_id == b"fmt ":
+                    fmt = struct.unpack("<HHIIHH", f.read(16))
+                    f.seek(size - 16 + (size & 1), 1)
+                elif chunk_id == b"data":
+                    data_offset = f.tell()
+                    break
+                else:
+                    f.seek(size + (size & 1), 1)
+
+            f.seek(0, 2)
+            available = f.tell() - data_offset
+
+        if fmt is None:
+            raise ValueError(f"WAV file has no fmt chunk: {self.path}")
+        audio_format, self.channels, self.sample_rate, _, _, bits = fmt
+        if audio_format != 1 or bits != 16:
+            raise ValueError(f"Expected 16-bit PCM audio: {self.path}")
+
+        # Streamed WAVs can carry a placeholder data size; trust the file length instead
+        size = available if size in (0, 0xFFFFFFFF) or size > available else size
+        self.frames = size // (2 * self.channels)
+        if self.frames:
+            self._pcm = np.memmap(self.path, dtype="<i2", mode="r", offset=data_offset, shape=(self.frames, self.channels))
+        else:
+            self._pcm = np.zeros((0, self.channels), dtype="<i2")
+
+    def __len__(self):
+        return self.frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+
+    def pcm(self, start=0, end=None):
+        """Zero-copy int16 view of frames [start, end), shape (frames, channels)."""
+        return self._pcm[start:end]
+
+    def window(self, start=0, end=None):
+        """Frames [start, end) as mono float32 samples in [-1, 1]."""
+        pcm = self.pcm(start, end)
+        if self.channels == 1:
+            return pcm[:, 0].astype(np.float32) / 32768.0
+        return pcm.mean(axis=1, dtype=np.float32) / 32768.0
+
+    def frame_energy_db(self, frame, block_seconds=60):
+        """
+        Mean energy (dB) of consecutive `frame`-sample frames, computed block by block
+        so only one block is ever converted to float.
+        """
+        count = self.frames // frame
+        energy = np.empty(count, dtype=np.float32)
+        per_block = max(1, int(block_seconds * self.sample_rate) // frame)
+        for first in range(0, count, per_block):
+            last = min(count, first + per_block)
+            samples = self.window(first * frame, last * frame).reshape(last - first, frame)
+            energy[first:last] = 10 * np.log10(np.mean(samples ** 2, axis=1) + 1e-10)
+        return energy
+
+    def close(self):
+        # The mapping is released once no window view refers to it any more
+        self._pcm = np.zeros((0, self.channels), dtype="<i2")